@@ -0,0 +1,38 @@
+import tracemalloc
+from argparse import ArgumentParser
+from json import dumps
+
+from model import Directory
+from model.util import generate_filesystem
+
+
+def count_nodes(root: Directory) -> int:
+    """Returns the amount of Entries in the tree, including the root Directory"""
+    return 1 + root.get_directory_count() + root.get_normal_file_count() + root.get_virus_file_count()
+
+
+def measure_memory(seed: int = 0, username: str = "benchmark") -> dict:
+    """Generates a filesystem and returns how much memory it holds on to
+
+    :param seed: The seed to generate the filesystem from
+    :param username: The username to generate the filesystem for
+    """
+    tracemalloc.start()
+    root, _, _ = generate_filesystem(username, seed)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = count_nodes(root)
+    return {
+        "seed": seed,
+        "nodes": nodes,
+        "bytes": current,
+        "peak_bytes": peak,
+        "bytes_per_node": round(current / nodes, 1)}
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Measures the memory used per node of a generated filesystem")
+    parser.add_argument("--seed", type=int, default=0, help="the seed to generate the filesystem from")
+    args = parser.parse_args()
+    print(dumps(measure_memory(args.seed), indent=4))
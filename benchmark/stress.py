@@ -0,0 +1,153 @@
+from argparse import ArgumentParser
+from json import dumps
+from random import Random
+from tempfile import mkdtemp
+from threading import Event, Thread
+from typing import List
+
+from model import Directory, NormalFile, VirusFile
+from model.console import Console
+from model.engine import Engine
+from model.util import Save, SaveWriter, Scheduler
+
+
+def check_directory(directory: Directory) -> List[str]:
+    """Returns the problems found in the Directory and everything below it
+    which are aggregates that do not match a recount and Entries with the wrong parent
+
+    :param directory: The Directory to check
+    """
+    problems = []
+    size = normal_files = virus_files = directories = 0
+    for entry in directory.get_entries():
+        if entry.get_parent() is not directory:
+            problems.append(f"{entry} does not point to its parent {directory}")
+        if isinstance(entry, Directory):
+            problems += check_directory(entry)
+            size += entry.get_size()
+            normal_files += entry.get_normal_file_count()
+            virus_files += entry.get_virus_file_count()
+            directories += entry.get_directory_count() + 1
+        else:
+            size += entry.get_size()
+            if isinstance(entry, VirusFile):
+                virus_files += 1
+            else:
+                normal_files += 1
+    counted = (size, normal_files, virus_files, directories)
+    held = (directory.get_size(), directory.get_normal_file_count(),
+            directory.get_virus_file_count(), directory.get_directory_count())
+    if counted != held:
+        problems.append(f"{directory} holds aggregates {held} but has {counted}")
+    return problems
+
+
+def random_command(console: Console, rng: Random) -> str:
+    """Returns a random command to run in the current directory of the Console"""
+    current_dir = console.get_current_dir()
+    entries = current_dir.get_entries()
+    files = [entry for entry in entries if isinstance(entry, NormalFile)]
+    directories = [entry for entry in entries if isinstance(entry, Directory)]
+    if current_dir is console.get_trash():
+        return rng.choice(["cd ..", "ls", "restore *", "mntr"] +
+                          [f"restore {file.get_name()}" for file in files[:3]] +
+                          [f"trace {file.get_name()}" for file in files[:3]])
+    commands = ["ls", "cd ..", "cd", "cd Trash", "mntr", "track"]
+    commands += [f"cd {directory.get_name()}" for directory in directories] * 2
+    commands += [f"cat {file.get_name()}" for file in files[:2]]
+    commands += [f"rm {file.get_name()}" for file in files[:2]]
+    # Removing the home directory, or anything above it, would erase every file at once
+    if str(current_dir).count("/") > 1:
+        commands += [f"rm -r {directory.get_name()}" for directory in directories[:1]]
+    commands += [f"track 1 {file.get_name()}" for file in files[:1]]
+    return rng.choice(commands)
+
+
+def stress(seed: int = 0, commands: int = 2000, username: str = "stress", speed: float = 0,
+           save_every: int = 10) -> dict:
+    """Runs random commands from the console while the Virus deletes files on a thread of its own
+    and the game is saved on the SaveWriter, and returns the problems found in the filesystem afterwards
+
+    The commands stop early if the Virus erases every file first, which a speed of 0 makes it try to do
+    as fast as it can take the lock on the filesystem
+
+    :param seed: The seed to generate the filesystem and pick the commands from
+    :param commands: The amount of commands to run
+    :param username: The username of the game save
+    :param speed: The speed at which the Virus deletes files, in seconds
+    :param save_every: The amount of commands to run between each save on the SaveWriter
+    """
+    Engine.use_folder(mkdtemp())
+    save = Save(username, seed)
+    save.set_speed(speed)
+    scheduler = Scheduler()
+    engine = Engine(save, scheduler=scheduler)
+    console = engine.get_console()
+    with save.transaction():
+        total_files = save.get_root().get_normal_file_count() + save.get_trash().get_normal_file_count()
+
+    # The Scheduler of the Virus is driven from a thread of its own, as it is from the Tk event loop in a game
+    stopped = Event()
+
+    def drive():
+        while not stopped.is_set():
+            scheduler.run_due()
+            delay = scheduler.get_next_delay()
+            if delay is None:
+                break
+            stopped.wait(delay)
+
+    driver = Thread(target=drive, name="Virus")
+    driver.start()
+    rng = Random(seed)
+    ran = saves = 0
+    for ran in range(1, commands + 1):
+        engine.run(random_command(console, rng))
+        if ran % save_every == 0:
+            SaveWriter.get_instance().submit(save)
+            saves += 1
+        if engine.get_result() is not None:
+            break
+    stopped.set()
+    driver.join()
+    SaveWriter.get_instance().flush()
+    in_play = engine.is_in_play()
+
+    with save.transaction():
+        problems = check_directory(save.get_root()) + check_directory(save.get_trash())
+        remaining = save.get_root().get_normal_file_count() + save.get_trash().get_normal_file_count()
+        if remaining != total_files:
+            problems.append(f"{total_files} normal files were generated but {remaining} remain")
+
+    save.save()
+    loaded = Save(username)
+    loaded.generate()
+    if loaded.get_root().to_json() != save.get_root().to_json():
+        problems.append("the filesystem does not match after it is saved and loaded")
+    loaded.close()
+    engine.stop(save=False)
+
+    return {
+        "seed": seed,
+        "commands": ran,
+        "saves": saves,
+        "files_deleted": save.get_normal_files()[0],
+        "files_restored": save.get_restored_files(),
+        "in_play": in_play,
+        "result": engine.get_result(),
+        "problems": problems}
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Runs random commands while the Virus deletes files and "
+                                        "checks that the filesystem is still consistent")
+    parser.add_argument("--seed", type=int, default=0, help="the seed to generate the filesystem from")
+    parser.add_argument("--commands", type=int, default=2000, help="the amount of commands to run")
+    parser.add_argument("--speed", type=float, default=0, help="the speed at which the virus deletes files")
+    parser.add_argument("--save-every", type=int, default=10,
+                        help="the amount of commands to run between each save on the background thread")
+    args = parser.parse_args()
+    result = stress(args.seed, args.commands, speed=args.speed, save_every=args.save_every)
+    print(dumps(result, indent=4))
+    if result["problems"]:
+        raise SystemExit(1)
@@ -0,0 +1,187 @@
+import gc
+import os
+import platform
+import subprocess
+import tracemalloc
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from json import dumps
+from tempfile import mkdtemp
+from time import perf_counter
+from typing import Callable, List, Optional
+
+from model import Directory, FilesystemTable, NormalFile
+from model.engine import Engine
+from model.util import Hexable, Save, generate_filesystem, generate_table
+
+# The amount of files generated for each top-level directory of the user directory, on average
+FILES_PER_DIRECTORY = 2250
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def directories_for(files: int) -> int:
+    """Returns the amount of top-level directories that generates close to the amount of files"""
+    return max(1, round(files / FILES_PER_DIRECTORY))
+
+
+def measure(function: Callable[[], object], items: int, repeat: int = 1, memory: bool = True) -> dict:
+    """Times the function and returns its average time, throughput, and peak memory
+
+    The peak memory is measured on a separate run of the function since tracing
+    the memory slows down everything that is being timed
+
+    :param function: The function to measure
+    :param items: The amount of items (files, commands, deletions) handled by a single call
+    :param repeat: The amount of times to call the function when timing it
+    :param memory: Whether or not to measure the peak memory of the function
+    """
+    gc.collect()
+    start = perf_counter()
+    for _ in range(repeat):
+        function()
+    seconds = (perf_counter() - start) / repeat
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "seconds": round(seconds, 6),
+        "items": items,
+        "items_per_second": round(items / seconds, 1) if seconds else None,
+        "peak_bytes": peak}
+
+
+# # # # # # # # # # # # # # # # # # # #
+
+
+def benchmark_filesystem(files: int, seed: int, folder: str, memory: bool) -> dict:
+    """Benchmarks generating, saving, and loading a filesystem of around the amount of files"""
+    directories = directories_for(files)
+    table, file_count, _ = generate_table("benchmark", seed, directories)
+    root = table.to_directory()
+    json = root.to_json()
+    file = f"{folder}/filesystem-{files}.hex"
+    Hexable.save(json, file)
+
+    results = {
+        "generate_table": measure(lambda: generate_table("benchmark", seed, directories, workers=1), file_count,
+                                  memory=memory),
+        "generate_table_parallel": measure(lambda: generate_table("benchmark", seed, directories,
+                                                                  workers=os.cpu_count()), file_count, memory=memory),
+        "generate_filesystem": measure(lambda: generate_filesystem("benchmark", seed, directories), file_count,
+                                       memory=memory),
+        "to_json": measure(root.to_json, file_count, memory=memory),
+        "hexable_save": measure(lambda: Hexable.save(json, file), file_count, memory=memory),
+        "hexable_load": measure(lambda: Hexable.load(file), file_count, memory=memory),
+        "directory_from_json": measure(lambda: Directory.from_json(json), file_count, memory=memory),
+        "table_from_json": measure(lambda: FilesystemTable.from_json(json), file_count, memory=memory)}
+    results["hexable_save"]["file_bytes"] = os.path.getsize(file)
+    results["generate_table_parallel"]["workers"] = os.cpu_count()
+    return results
+
+
+def benchmark_game(files: int, seed: int, memory: bool, commands: int = 200, ticks: int = 1000) -> dict:
+    """Benchmarks creating and loading a game save, the commands played in it, and the Virus deleting files"""
+    directories = directories_for(files)
+    username = f"benchmark{files}"
+    save = Save(username, seed, directories=directories)
+    start = perf_counter()
+    save.generate()
+    seconds = perf_counter() - start
+    file_count = save.get_remaining_files()
+    results = {
+        "new_game": {
+            "seconds": round(seconds, 6),
+            "items": file_count,
+            "items_per_second": round(file_count / seconds, 1),
+            "peak_bytes": None},
+        "load_game": measure(lambda: Save(username, seed).generate(), file_count, memory=memory)}
+
+    save = Save(username, seed)
+    engine = Engine(save)
+    home = engine.get_console().get_current_dir()
+    directory = next(entry for entry in home.get_entries() if isinstance(entry, Directory))
+    file = find_file(home)
+
+    def run(*lines: str):
+        for _ in range(commands):
+            for line in lines:
+                engine.run(line)
+
+    results["ls"] = measure(lambda: run("ls"), commands, memory=memory)
+    results["cd"] = measure(lambda: run(f"cd {directory.get_name()}", "cd .."), commands * 2, memory=memory)
+    if file is not None:
+        engine.get_console().set_current_dir(file.get_parent())
+        results["rm_restore"] = measure(lambda: run(f"rm {file.get_name()}", "cd Trash",
+                                                    f"restore {file.get_name()}", "cd .."),
+                                        commands * 4, memory=memory)
+
+    engine.get_console().set_speed(1)
+    results["virus_ticks"] = measure(lambda: engine.advance(ticks), ticks, memory=memory)
+    engine.stop(save=False)
+    return results
+
+
+def find_file(directory: Directory) -> Optional[NormalFile]:
+    """Returns the first normal file found below the Directory"""
+    for entry in directory.get_entries():
+        if type(entry) is NormalFile:
+            return entry
+        if isinstance(entry, Directory):
+            file = find_file(entry)
+            if file is not None:
+                return file
+
+
+def git_commit() -> Optional[str]:
+    """Returns the commit that is checked out, if the benchmarks are run from a git repository"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes: List[int], seed: int = 0, memory: bool = True) -> dict:
+    """Runs every benchmark for each size and returns the results as a JSON object
+
+    :param sizes: The amounts of files to generate the filesystems with
+    :param seed: The seed to generate every filesystem from
+    :param memory: Whether or not to measure the peak memory of each benchmark
+    """
+    folder = mkdtemp()
+    Engine.use_folder(folder)
+    results = {
+        "commit": git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "sizes": {}}
+    for files in sizes:
+        results["sizes"][str(files)] = {
+            "filesystem": benchmark_filesystem(files, seed, folder, memory),
+            "game": benchmark_game(files, seed, memory)}
+    return results
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmarks generating, saving, loading, and playing "
+                                        "seeded filesystems of different sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="the amounts of files to generate the filesystems with")
+    parser.add_argument("--seed", type=int, default=0, help="the seed to generate every filesystem from")
+    parser.add_argument("--no-memory", action="store_true", help="skip measuring the peak memory")
+    parser.add_argument("--output", help="the file to write the JSON results into, instead of stdout")
+    args = parser.parse_args()
+
+    suite = dumps(run_suite(args.sizes, args.seed, not args.no_memory), indent=4)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(suite)
+    else:
+        print(suite)
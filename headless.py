@@ -0,0 +1,89 @@
+import sys
+import tracemalloc
+from argparse import ArgumentParser, FileType
+from json import dumps
+from statistics import mean, median
+from tempfile import mkdtemp
+
+from model.engine import Engine
+from model.util import Save
+
+
+def summarize(results: list) -> dict:
+    """Returns the latency of the commands in the results, in milliseconds"""
+    latencies = sorted(result["seconds"] * 1000 for result in results)
+    if not latencies:
+        return {"commands": 0}
+    return {
+        "commands": len(latencies),
+        "total_ms": round(sum(latencies), 3),
+        "mean_ms": round(mean(latencies), 3),
+        "median_ms": round(median(latencies), 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        "max_ms": round(latencies[-1], 3)}
+
+
+def main():
+    parser = ArgumentParser(description="Replays a command script against a seeded game save "
+                                        "without the UI and reports how long each command took")
+    parser.add_argument("script", nargs="?", type=FileType("r"), default=sys.stdin,
+                        help="the file of commands to run, one per line, which defaults to stdin")
+    parser.add_argument("--seed", type=int, default=0, help="the seed to generate the filesystem from")
+    parser.add_argument("--username", default="headless", help="the username of the game save")
+    parser.add_argument("--folder", help="the folder to keep the game save in, which defaults to a new "
+                                         "temporary folder so the player's saves are never touched")
+    parser.add_argument("--speed", type=float, help="the speed at which the virus deletes files, in seconds")
+    parser.add_argument("--tick", type=float, default=0,
+                        help="the amount of in-game seconds that pass after each command")
+    parser.add_argument("--output", action="store_true", help="include the output of each command")
+    parser.add_argument("--json", action="store_true", help="print the results as a JSON object")
+    parser.add_argument("--memory", action="store_true",
+                        help="measure the peak memory of loading the game save, which slows down the load")
+    args = parser.parse_args()
+
+    Engine.use_folder(args.folder or mkdtemp())
+    save = Save(args.username, args.seed)
+    peak = None
+    if args.memory:
+        tracemalloc.start()
+    engine = Engine(save, tick=args.tick)
+    if args.memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    # The speed is set once the game save is loaded since loading it restores its stored speed
+    if args.speed is not None:
+        engine.get_console().set_speed(args.speed)
+    load = save.get_load_report()
+    if load is not None and peak is not None:
+        load = {**load, "peak_bytes": peak}
+    if load is not None and not args.json:
+        print(f"{load['seconds'] * 1000:10.3f} ms  (load)" +
+              (f"  {peak} bytes at peak" if peak is not None else ""))
+
+    results = []
+    for result in engine.run_all(args.script):
+        if not args.output:
+            del result["output"]
+        results.append(result)
+        if not args.json:
+            print(f"{result['seconds'] * 1000:10.3f} ms  {result['command']}")
+            if args.output and result["output"]:
+                print(result["output"])
+    result = engine.get_result()
+    engine.stop()
+
+    # The commands after the game is lost or won are never run
+    summary = summarize(results)
+    if args.json:
+        print(dumps({"seed": args.seed, "load": load, "result": result, "summary": summary, "results": results},
+                    indent=4))
+    else:
+        if result == "@game_over":
+            print("game over: the virus erased every file")
+        elif result == "@won":
+            print("won: every virus file was deleted")
+        print(dumps(summary, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from tkinter import Tk, Text, END, BOTH
 
 from model.theme import Theme
 from model.console import Console
+from model.util import Scheduler
 
 
 class ConsoleUI(Tk):
@@ -16,6 +17,9 @@ class ConsoleUI(Tk):
         self.configure(background="black")
         self.__console = Console(self)
 
+        # Every Virus deletes its files from timers on the Tk event loop
+        Scheduler.get_instance().attach_tk(self)
+
         self.__text = Text(self)
         self.__text.configure(font=("Courier New", 15), bg="black", fg="white",
                               insertbackground="white", insertwidth=4)
@@ -122,34 +126,37 @@ class ConsoleUI(Tk):
         else:
             dir_line_split = line_split[-1].split("/")
 
-        # Iterate through the entries in the most recent directory to try to auto complete it
-        current_dir = self.__console.get_current_dir()
-        if len(dir_line_split) > 1:
-            for entry in dir_line_split[:-1]:
-                if entry == "..":
-                    if current_dir.get_parent():
-                        current_dir = current_dir.get_parent()
-                elif entry != ".":
-                    current_dir = current_dir.get_entry(entry)
-
-        # If the directory exists, try finding the entry that matches the last result
-        if current_dir and dir_line_split[-1]:
-            for entry in current_dir.get_entries():
-                if entry.get_name().startswith(dir_line_split[-1]):
-
-                    # Find the text that needs to be appended by only adding the
-                    #   text that is left in the found entry
-                    # Update the last index of the dir_line_split, join it together using "/"
-                    #   and replace the current line with the updated string
-                    appended_text = entry.get_name()[len(dir_line_split[-1]):]
-                    dir_line_split[-1] = entry.get_name()
-                    line_split[-1] = "/".join(dir_line_split)
-                    if no_spaces:
-                        self.__current_line = "/".join(line_split)
-                    else:
-                        self.__current_line = " ".join(line_split)
-                    self.__current_index = len(self.__current_line)
-                    self.__text.insert("end", appended_text)
+        # The Virus may be moving entries around while this runs so the filesystem is held for it
+        with self.__console.transaction():
+
+            # Iterate through the entries in the most recent directory to try to auto complete it
+            current_dir = self.__console.get_current_dir()
+            if len(dir_line_split) > 1:
+                for entry in dir_line_split[:-1]:
+                    if entry == "..":
+                        if current_dir.get_parent():
+                            current_dir = current_dir.get_parent()
+                    elif entry != ".":
+                        current_dir = current_dir.get_entry(entry)
+
+            # If the directory exists, try finding the entry that matches the last result
+            if current_dir and dir_line_split[-1]:
+                for entry in current_dir.get_entries():
+                    if entry.get_name().startswith(dir_line_split[-1]):
+
+                        # Find the text that needs to be appended by only adding the
+                        #   text that is left in the found entry
+                        # Update the last index of the dir_line_split, join it together using "/"
+                        #   and replace the current line with the updated string
+                        appended_text = entry.get_name()[len(dir_line_split[-1]):]
+                        dir_line_split[-1] = entry.get_name()
+                        line_split[-1] = "/".join(dir_line_split)
+                        if no_spaces:
+                            self.__current_line = "/".join(line_split)
+                        else:
+                            self.__current_line = " ".join(line_split)
+                        self.__current_index = len(self.__current_line)
+                        self.__text.insert("end", appended_text)
         return "break"
 
     def on_key_press(self, event):
@@ -175,7 +182,10 @@ class ConsoleUI(Tk):
             self.__prev_index = -1
         cleared = result == "@clear"
         prompted = False
-        if result:
+        if result is not None and not isinstance(result, str):
+            for index, chunk in enumerate(result):
+                self.__text.insert("end", f"\n{chunk}" if index == 0 else chunk)
+        elif result:
             if result == "@clear":
                 self.__text.delete(1.0, "end")
             elif result == "@main_menu":
@@ -208,6 +218,20 @@ class ConsoleUI(Tk):
         self.__text.mark_set("insert", END)
         return "break"
 
+    def on_game_over(self, result: str):
+        """Shows the end of the game when the Virus has erased all files
+        while the player is in the middle of typing a command
+        """
+        if result == "@game_over":
+            self.__text.insert("end", "\nFilesystem error: Empty system: Virus has erased all files (You Lost.)")
+            self.__console.main_menu()
+            self.__current_line = ""
+            self.__current_index = 0
+            self.__text.insert("end", "\n")
+            self.insert_prompt()
+            self.__text.see(END)
+            self.__text.mark_set("insert", END)
+
     def on_bs(self, _):
         """This overrides the backspace key bind event to deal with backspacing the current line
         only until the beginning of the prompt is reached.
@@ -3,3 +3,6 @@ from model.normal_file import NormalFile
 from model.virus_file import VirusFile
 from model.save_file import SaveFile
 from model.directory import Directory
+from model.table_directory import TableDirectory
+from model.store_directory import StoreDirectory
+from model.filesystem_table import FilesystemTable
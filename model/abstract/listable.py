@@ -6,6 +6,8 @@ class Listable:
     if there are contents that can be listed simply by the name
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def list_contents(self, show_hidden: bool = False):
         pass
@@ -6,6 +6,8 @@ class Serializable:
     for JSON conversion and extraction
     """
 
+    __slots__ = ()
+
     @staticmethod
     @abstractmethod
     def from_json(json: dict):
@@ -6,6 +6,8 @@ class Sizable:
     for returning the size of the data structure
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def get_size(self) -> int:
         pass
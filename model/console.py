@@ -1,4 +1,6 @@
-from typing import List, Optional, Tuple, Union
+from contextlib import nullcontext
+from datetime import datetime
+from typing import ContextManager, Iterator, List, Optional, Tuple, Union
 
 from model import Directory, NormalFile, SaveFile
 from model.theme import Theme
@@ -12,11 +14,13 @@ class Console:
     the root directory, the current menu (if on the main menu), and the trash directory
     """
 
-    VIRUS_WEIGHT = 0.7
-    NORMAL_WEIGHT = 0.3
+    VIRUS_WEIGHT = Save.VIRUS_WEIGHT
+    NORMAL_WEIGHT = Save.NORMAL_WEIGHT
+    AUTOSAVE_INTERVAL = 60  # Time in seconds between each autosave of the game being played
 
-    def __init__(self, console_ui):
+    def __init__(self, console_ui, scheduler: Scheduler = None):
         self.__console_ui = console_ui
+        self.__scheduler = scheduler if scheduler is not None else Scheduler.get_instance()
         self.__save = None
         self.__in_play = False
         self.__in_tutorial = False
@@ -38,6 +42,7 @@ class Console:
 
         # Game variables
         self.__virus = None
+        self.__autosave_timer = None
         self.__saves = []
         self.__themes = []
         self.__current_theme = Options.get_instance().get_last_theme()
@@ -100,17 +105,50 @@ class Console:
         """Returns the current save being used by the console"""
         return self.__save
 
-    def set_save(self, username: str):
+    def set_save(self, save: Union[str, Save]):
         """Sets the save object being used for the Console
 
-        If no save is found with the username, one will be created
+        If a username is given and no save is found with the username, one will be created
 
-        :param username: The username of the object to load from
+        :param save: The username of the object to load from, or the Save object itself
         """
-        self.__save = Save(username)
+        if isinstance(save, str):
+            save = Save(save)
+        if self.__save is not None and self.__save is not save:
+            SaveWriter.get_instance().flush()
+            self.__save.close()
+        self.__save = save
         self.__save.generate()
-        self.__current_dir = self.__save.get_root().get_entry("usr").get_entry(username)
-        self.__virus = Virus(self.__save, self.game_over)
+        self.__current_dir = self.__save.get_root().get_entry("usr").get_entry(save.get_username())
+        self.__virus = Virus(self.__save, self.__on_virus_finished, self.__scheduler)
+        self.__autosave_timer = self.__scheduler.schedule(Console.AUTOSAVE_INTERVAL, self.__autosave)
+
+    def set_speed(self, speed: float):
+        """Sets the speed at which the virus of the current save deletes files, in seconds,
+        and reschedules its next deletion at the new speed
+
+        :param speed: The amount of seconds between each deletion
+        """
+        with self.transaction():
+            self.__save.set_speed(speed)
+            if self.__virus is not None:
+                self.__virus.stop()
+                self.__virus.start()
+
+    def __autosave(self):
+        """Saves the game being played on the background SaveWriter and schedules the next autosave"""
+        self.__autosave_timer = None
+        if self.__in_play and self.__save is not None:
+            SaveWriter.get_instance().submit(self.__save)
+            self.__autosave_timer = self.__scheduler.schedule(Console.AUTOSAVE_INTERVAL, self.__autosave)
+
+    def transaction(self) -> ContextManager:
+        """Returns a context manager that holds the filesystem of the current save
+        so that the Virus cannot change it while a command is running
+        """
+        if self.__in_play and self.__save is not None:
+            return self.__save.transaction()
+        return nullcontext()
 
     def remove_save(self, username: str):
         """Removes the save with the specified username from the Saves list"""
@@ -185,8 +223,17 @@ class Console:
 
     # # # # # # # # # # # # # # # # # # # #
 
-    def parse(self, cmd: str) -> Optional[str]:
-        """Parses the given command"""
+    def parse(self, cmd: str) -> Optional[Union[str, Iterator[str]]]:
+        """Parses the given command
+
+        Commands with output that can grow very large, like cat, return an iterator
+        over chunks of the output instead of a single string so it can be shown as it is made
+        """
+        with self.transaction():
+            return self.__run_command(cmd)
+
+    def __run_command(self, cmd: str) -> Optional[Union[str, Iterator[str]]]:
+        """Runs the given command and returns its result"""
         cmd = cmd.split(" ")
         cmd, args = cmd[0], cmd[1:]
 
@@ -216,7 +263,7 @@ class Console:
         elif cmd == "exit":
             if self.__in_play:
                 self.__in_play = False
-                self.__save.save()
+                SaveWriter.get_instance().submit(self.__save)
                 return "@main_menu"
             if self.__in_tutorial:
                 self.__in_tutorial = False
@@ -236,6 +283,11 @@ class Console:
         self.__in_play = False
         return "@game_over"
 
+    def __on_virus_finished(self):
+        """The function called by the Virus once it has deleted every normal file on the system"""
+        if self.__in_play:
+            self.__console_ui.on_game_over(self.game_over())
+
     # # # # # # # # # # # # # # # # # # # #
 
     def get_themes(self) -> list:
@@ -289,19 +341,18 @@ class Console:
         """Loads the saves from the Save directory"""
         self.__saves: List[Union[Tuple[Save, str], Save]] = Save.load_saves()
         for i in range(len(self.__saves)):
-            v_d, v_t = self.__saves[i].get_virus_files()  # Deleted virus files, Total virus files
-            n_d, _ = self.__saves[i].get_normal_files()  # Deleted normal files, Total normal files
-            n_r = self.__saves[i].get_restored_files()
             save_str = ("username: {}\n" +
                         "\tvirus files (deleted/total): {}/{}\n" +
                         "\tnormal files (restored/deleted): {}/{}\n" +
-                        "\t{}% completed").format(
+                        "\t{}% completed\n" +
+                        "\tlast saved: {}").format(
                 self.__saves[i].get_username(),
                 *self.__saves[i].get_virus_files(),
-                self.__saves[i].get_restored_files(), n_d,
-                round(
-                    Console.VIRUS_WEIGHT * (v_d / (v_t if v_t != 0 else 1)) * 100 +
-                    Console.NORMAL_WEIGHT * (n_r / (n_d if n_d != 0 else 1)) * 100, 2))
+                self.__saves[i].get_restored_files(), self.__saves[i].get_normal_files()[0],
+                self.__saves[i].get_completion(),
+                datetime.fromtimestamp(self.__saves[i].get_last_saved()).strftime("%Y-%m-%d %H:%M")
+                if self.__saves[i].get_last_saved() is not None
+                else "never")
             self.__saves[i] = (self.__saves[i], save_str)
 
     def load_themes(self):
@@ -330,7 +381,15 @@ class Console:
         if self.__virus:
             self.__virus.stop()
             self.__virus = None
-
+        if self.__autosave_timer is not None:
+            self.__scheduler.cancel(self.__autosave_timer)
+            self.__autosave_timer = None
+
+        # The game being left is saved on the SaveWriter, outside of the lock on its filesystem,
+        #   and is waited for so the main menu shows the game save as it was left
+        SaveWriter.get_instance().flush()
+        if self.__save is not None:
+            self.__save.close()
         self.load_saves()
         self.load_themes()
 
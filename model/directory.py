@@ -1,4 +1,8 @@
-from typing import List, Optional, Union
+import gc
+from functools import partial
+from operator import itemgetter
+from sys import intern
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from model import Entry, NormalFile, VirusFile, SaveFile
 from model.abstract import Listable
@@ -12,30 +16,235 @@ class Directory(Listable, Entry):
     :param entries: The list of Entry objects to put inside of the Directory
     """
 
+    # The amount of normal files and sub-directories a Directory holds before the position
+    #   of each one in its list is kept, instead of being searched for when it is removed
+    INDEXED_ENTRIES = 64
+
+    __slots__ = ("__entries", "__sorted_entries", "__files", "__subdirectories", "__positions",
+                 "__size", "__normal_files", "__virus_files", "__directories", "__path", "__path_version")
+
+    # The version of every cached path which is bumped whenever a Directory
+    #   is renamed or moved since that changes the path of every Directory below it
+    __paths_version = 0
+
     def __init__(self, name: str, entries: List[Entry] = None, parent: 'Directory' = None):
+        self.__path: Optional[str] = None
+        self.__path_version = -1
         super().__init__(name, parent)
+
+        # A Directory only has an original parent once it is moved into the Trash
+        self.set_original_parent(None)
+        self.__entries: Dict[str, Entry] = {}
+        self.__sorted_entries: Optional[Tuple[Entry, ...]] = None
+
+        # Indexable lists of the normal files and sub-directories directly inside this Directory,
+        #   used to choose random entries, with the position of each one in its list once there are many
+        self.__files: List[NormalFile] = []
+        self.__subdirectories: List[Directory] = []
+        self.__positions: Optional[Dict[str, int]] = None
+
+        # Aggregates of the entire subtree below this Directory
+        self.__size = 0
+        self.__normal_files = 0
+        self.__virus_files = 0
+        self.__directories = 0
+        for entry in entries or []:
+            if self.__entries.setdefault(entry.get_name(), entry) is entry:
+                self.__apply_aggregates(*Directory.__aggregates_of(entry))
+                self.__index_entry(entry)
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    @staticmethod
+    def __aggregates_of(entry: Entry) -> Tuple[int, int, int, int]:
+        """Returns a 4-tuple of the size, normal file count, virus file count and directory count
+        that the specified Entry adds to the Directory it is in
+        """
+        if isinstance(entry, Directory):
+            return (entry.get_size(), entry.get_normal_file_count(),
+                    entry.get_virus_file_count(), entry.get_directory_count() + 1)
+        if isinstance(entry, VirusFile):
+            return entry.get_size(), 0, 1, 0
+        if isinstance(entry, NormalFile):
+            return entry.get_size(), 1, 0, 0
+        return entry.get_size(), 0, 0, 0
+
+    def __apply_aggregates(self, size: int, normal_files: int, virus_files: int, directories: int):
+        """Adds the specified amounts to the aggregates of this Directory"""
+        self.__size += size
+        self.__normal_files += normal_files
+        self.__virus_files += virus_files
+        self.__directories += directories
+
+    def __update_aggregates(self, sign: int, entry: Entry):
+        """Updates the aggregates of this Directory and every Directory above it
+        after the specified Entry was added (sign of 1) or removed (sign of -1)
+
+        The update stops at the first parent that does not contain the Directory
+        as the Directory is not yet, or no longer, part of that parent's subtree
+        """
+        self.__propagate_aggregates(*(sign * amount for amount in Directory.__aggregates_of(entry)))
+
+    def __propagate_aggregates(self, size: int, normal_files: int, virus_files: int, directories: int):
+        """Adds the specified amounts to the aggregates of this Directory and every Directory above it"""
+        directory = self
+        while directory is not None:
+            directory.__apply_aggregates(size, normal_files, virus_files, directories)
+            parent = directory.get_parent()
+            if parent is None or parent.get_entry(directory.get_name()) is not directory:
+                break
+            directory = parent
+
+    def __index_list(self, entry: Entry) -> Optional[list]:
+        """Returns the indexable list that the specified Entry belongs in, if any"""
+        if isinstance(entry, Directory):
+            return self.__subdirectories
+        if isinstance(entry, NormalFile) and not isinstance(entry, VirusFile):
+            return self.__files
+        return None
+
+    def __index_entry(self, entry: Entry):
+        """Adds the specified Entry to the end of its indexable list"""
+        entries = self.__index_list(entry)
         if entries is None:
-            entries = []
-        self.__entries = entries
+            return
+        if self.__positions is not None:
+            self.__positions[entry.get_name()] = len(entries)
+        entries.append(entry)
+        if self.__positions is None and len(self.__files) + len(self.__subdirectories) > Directory.INDEXED_ENTRIES:
+            self.__positions = {indexed.get_name(): position
+                                for indexed_entries in [self.__files, self.__subdirectories]
+                                for position, indexed in enumerate(indexed_entries)}
+
+    def __unindex_entry(self, entry: Entry):
+        """Removes the specified Entry from its indexable list by moving
+        the last Entry of the list into its position
+        """
+        entries = self.__index_list(entry)
+        if entries is not None:
+            if self.__positions is not None:
+                position = self.__positions.pop(entry.get_name())
+            else:
+                position = entries.index(entry)
+            last = entries.pop()
+            if position < len(entries):
+                entries[position] = last
+                if self.__positions is not None:
+                    self.__positions[last.get_name()] = position
+
+    def __str__(self):
+        if self.__path is None or self.__path_version != Directory.__paths_version:
+            self.__path = intern(super().__str__())
+            self.__path_version = Directory.__paths_version
+        return self.__path
+
+    def _invalidate_path(self):
+        """Invalidates the cached paths of this Directory and every Directory below it"""
+        Directory.__paths_version += 1
+
+    def _set_aggregates(self, size: int, normal_files: int, virus_files: int, directories: int):
+        """Sets the aggregates of this Directory for subclasses that know them
+        before their Entries are loaded
+        """
+        self.__size = size
+        self.__normal_files = normal_files
+        self.__virus_files = virus_files
+        self.__directories = directories
+
+    def _load_entries(self, entries: Iterable[Entry]):
+        """Adds Entries whose sizes and counts are already included in the aggregates
+        of this Directory without updating them
+        """
+        for entry in entries:
+            if self.__entries.setdefault(entry.get_name(), entry) is entry:
+                self.__index_entry(entry)
+        self.__sorted_entries = None
 
     # # # # # # # # # # # # # # # # # # # #
 
     def get_size(self) -> int:
         """Returns the size of this Directory (in bytes)"""
-        total_size = 0
-        for entry in self.__entries:
-            total_size += entry.get_size()
-        return total_size
+        return self.__size
+
+    def get_normal_file_count(self) -> int:
+        """Returns the amount of normal files in this Directory and all of its sub-directories"""
+        return self.__normal_files
+
+    def get_virus_file_count(self) -> int:
+        """Returns the amount of virus files in this Directory and all of its sub-directories"""
+        return self.__virus_files
+
+    def get_directory_count(self) -> int:
+        """Returns the amount of Directories below this Directory"""
+        return self.__directories
 
     def get_entry(self, entry: str) -> Optional[Union['Directory', NormalFile, VirusFile, Entry]]:
         """Returns the Entry object given by the specified entry"""
-        for e in self.get_entries():
-            if e.get_name() == entry:
-                return e
+        return self.__entries.get(entry)
 
-    def get_entries(self) -> List[Entry]:
-        """Returns the list of Entries in this Directory"""
-        return list(self.__entries)
+    def get_entries(self) -> Tuple[Entry, ...]:
+        """Returns the Entries in this Directory sorted by their name
+
+        The sorted view is cached and is only rebuilt after this Directory is modified
+        """
+        if self.__sorted_entries is None:
+            self.__sorted_entries = tuple(self.__entries[name] for name in sorted(self.__entries))
+        return self.__sorted_entries
+
+    def get_files(self) -> List[NormalFile]:
+        """Returns the normal files directly inside this Directory in no particular order
+
+        The list is kept up to date by this Directory and must not be modified
+        """
+        return self.__files
+
+    def get_directories(self) -> List['Directory']:
+        """Returns the Directories directly inside this Directory in no particular order
+
+        The list is kept up to date by this Directory and must not be modified
+        """
+        return self.__subdirectories
+
+    def resolve(self, path: str) -> Optional[Union['Directory', NormalFile, VirusFile, Entry]]:
+        """Returns the Entry that the "/"-separated path points to, if it exists
+
+        The path is relative to this Directory unless its first part is the name of
+        the root Directory above this Directory, in which case it is absolute.
+        "." refers to the current Directory and ".." to the parent Directory.
+
+        :param path: The path of the Entry to find
+        """
+        target = self
+        start = 0
+        length = len(path)
+        while start <= length:
+            end = path.find("/", start)
+            if end == -1:
+                end = length
+            part = path[start:end]
+            if part == "..":
+                if target.get_parent():
+                    target = target.get_parent()
+            elif part and part != ".":
+                if not isinstance(target, Directory):
+                    return None
+                entry = target.get_entry(part)
+                if entry is None and start == 0:
+                    entry = self.get_root()
+                    if entry.get_name() != part:
+                        entry = None
+                if entry is None:
+                    return None
+                target = entry
+            start = end + 1
+        return target
+
+    def get_root(self) -> 'Directory':
+        """Returns the Directory at the very top of the tree this Directory is in"""
+        root = self
+        while root.get_parent():
+            root = root.get_parent()
+        return root
 
     def is_populated(self):
         """Returns whether or not there are any items in this Directory"""
@@ -49,14 +258,15 @@ class Directory(Listable, Entry):
 
         If the name of the Entry given already exists, it will not be added.
         """
-        for e in self.get_entries():
-            if e.get_name() == entry.get_name():
-                return False
-        self.__entries.append(entry)
-        self.__entries.sort()
+        if entry.get_name() in self.__entries:
+            return False
+        self.__entries[entry.get_name()] = entry
+        self.__sorted_entries = None
+        self.__update_aggregates(1, entry)
+        self.__index_entry(entry)
         return True
 
-    def remove_entry(self, entry: Union[int, str, Entry]) -> Optional[Entry]:
+    def remove_entry(self, entry: Union[int, str, Entry], recursive: bool = False) -> Optional[Entry]:
         """Removes the specified Entry from this Directory and returns it, if applicable
 
         The Entry can be specified by an offset, an Entry name, or an
@@ -65,30 +275,68 @@ class Directory(Listable, Entry):
         If no Entry is found with the specified data, nothing will be returned
 
         :param entry: The target Entry to remove from the Directory
+        :param recursive: Whether or not a Directory that still has Entries inside of it can be removed
         """
         if isinstance(entry, Entry):
-            target = entry
+            target = self.__entries.get(entry.get_name())
         elif isinstance(entry, int):
-            target = self.__entries[entry]
+            target = self.get_entries()[entry]
         else:
-            target = None
-            for e in self.__entries:
-                if e.get_name() == entry:
-                    target = e
-            if target is None:
-                return None
-        if isinstance(target, Directory) and target.is_populated():
+            target = self.__entries.get(entry)
+        if target is None:
             return None
-        self.__entries.remove(target)
+        if not recursive and isinstance(target, Directory) and target.is_populated():
+            return None
+        del self.__entries[target.get_name()]
+        self.__sorted_entries = None
+        self.__update_aggregates(-1, target)
+        self.__unindex_entry(target)
         return target
 
-    def add_entries(self, *entries: Entry):
-        """Adds a list of new entries to this Directory.
+    def add_entries(self, *entries: Entry) -> List[Entry]:
+        """Adds a list of new entries to this Directory and returns the Entries that were added
 
+        The aggregates of the Directories above this one are only updated once for all of the Entries.
         If the name of the Entry given already exists, it will not be added.
         """
+        added = []
+        totals = [0, 0, 0, 0]
         for entry in entries:
-            self.add_entry(entry)
+            if self.__entries.setdefault(entry.get_name(), entry) is not entry:
+                continue
+            for index, amount in enumerate(Directory.__aggregates_of(entry)):
+                totals[index] += amount
+            self.__index_entry(entry)
+            added.append(entry)
+        if added:
+            self.__sorted_entries = None
+            self.__propagate_aggregates(*totals)
+        return added
+
+    def remove_entries(self, entries: Iterable[Entry], recursive: bool = False) -> List[Entry]:
+        """Removes the specified Entries from this Directory and returns the Entries that were removed
+
+        The aggregates of the Directories above this one are only updated once for all of the Entries.
+
+        :param entries: The Entries to remove from the Directory
+        :param recursive: Whether or not Directories that still have Entries inside of them can be removed
+        """
+        removed = []
+        totals = [0, 0, 0, 0]
+        for entry in entries:
+            if self.__entries.get(entry.get_name()) is not entry:
+                continue
+            if not recursive and isinstance(entry, Directory) and entry.is_populated():
+                continue
+            del self.__entries[entry.get_name()]
+            for index, amount in enumerate(Directory.__aggregates_of(entry)):
+                totals[index] -= amount
+            self.__unindex_entry(entry)
+            removed.append(entry)
+        if removed:
+            self.__sorted_entries = None
+            self.__propagate_aggregates(*totals)
+        return removed
 
     # # # # # # # # # # # # # # # # # # # #
 
@@ -113,10 +361,59 @@ class Directory(Listable, Entry):
         return "\n".join(directories + files)
 
     def to_json(self) -> dict:
-        return {
-            "type": "Directory",
-            "name": self.get_name(),
-            "entries": [entry.to_json() for entry in self.__entries]}
+        return self.snapshot()()
+
+    def snapshot(self) -> Callable[..., dict]:
+        """Returns a function that returns the JSON object of this Directory as it is right now,
+        which can be called later, without holding the lock on the filesystem, while the Directory keeps changing
+
+        Only the Entries of each Directory are copied, which is far quicker than creating the JSON object,
+        since files never change once they are created. The garbage collector is paused while they are copied,
+        otherwise the many small copies make it go through every object in the game over and over.
+
+        The function can be given a dictionary that it fills with the record of every Directory whose
+        JSON object is read from a FilesystemStore, keyed by the id of the JSON object
+        """
+        copies = {}
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            self._copy(copies)
+        finally:
+            if collecting:
+                gc.enable()
+        return partial(Directory.__to_json, copies, id(self))
+
+    def _copy(self, copies: Dict[int, Union[tuple, Callable]]):
+        """Copies what the JSON object of this Directory and of every Directory below it is created from,
+        keyed by the id of each Directory, or a function that creates the JSON object itself
+
+        :param copies: The copies made so far by snapshot
+        """
+        copies[id(self)] = (self._add_original_parent({"type": "Directory", "name": self.get_name()}),
+                            tuple(self.__entries.values()))
+        for directory in self.__subdirectories:
+            directory._copy(copies)
+
+    @staticmethod
+    def __to_json(copies: Dict[int, Union[tuple, Callable]], key: int, records: Dict[int, int] = None) -> dict:
+        """Returns the JSON object of a Directory from what was copied of it by snapshot"""
+        copy = copies[key]
+        if callable(copy):
+            return copy(records)
+        json, entries = copy
+        entries = [Directory.__to_json(copies, id(entry), records) if isinstance(entry, Directory) else entry.to_json()
+                   for entry in entries]
+        entries.sort(key=itemgetter("name"))
+        return {**json, "entries": entries}
+
+    def _add_original_parent(self, json: dict) -> dict:
+        """Adds the original parent of this Directory to its JSON object if it was moved away
+        from where it started out, into the Trash, which is the only time it is needed
+        """
+        if self.get_original_parent() is not None and self.get_original_parent() != str(self.get_parent()):
+            json["parent"] = self.get_original_parent()
+        return json
 
     # # # # # # # # # # # # # # # # # # # #
 
@@ -144,9 +441,9 @@ class Directory(Listable, Entry):
                 entries.append(Directory.from_json(entry))
             else:
                 raise ValueError(f"\"{entry['type']}\" not recognized as an Entry type")
-        entries.sort()
 
         dir_obj = Directory(json["name"], entries)
+        dir_obj.set_original_parent(json.get("parent"))
         for entry in entries:
             entry.set_parent(dir_obj)
         return dir_obj
@@ -0,0 +1,159 @@
+from time import perf_counter
+from typing import Iterable, Iterator, Optional
+
+from model.console import Console
+from model.theme import Theme
+from model.util import Options, Save, SaveWriter, Scheduler
+
+
+class Engine:
+    """The Engine runs a game save without any UI so that games can be played
+    from scripts, tests, or thousands of simulated sessions at once
+
+    The Engine stands in for the ConsoleUI that the Console normally calls back into.
+    Time in the game only passes when the Engine is told so through advance(),
+    or by the tick after each command, which, along with the Virus making its choices
+    from the seed of the save, makes every run of the same commands against the same
+    seeded save behave the same way. Once the game is lost or won, no more commands are run.
+
+    :param save: The Save to play, which is created if it does not exist yet
+    :param tick: The amount of in-game seconds that pass after each command
+    :param scheduler: The Scheduler that the Virus runs on, which defaults to one
+        that runs on the in-game time of this Engine
+    """
+
+    def __init__(self, save: Save, tick: float = 0, scheduler: Scheduler = None):
+        self.__time = 0.0
+        self.__tick = tick
+        self.__owns_clock = scheduler is None
+        self.__scheduler = scheduler if scheduler is not None else Scheduler(clock=self.get_time)
+        self.__result: Optional[str] = None
+
+        self.__console = Console(self, self.__scheduler)
+        self.__console.set_save(save)
+        self.__console.in_play()
+
+    @staticmethod
+    def use_folder(folder: str):
+        """Keeps the options, themes, and saves of every game inside the specified folder
+        instead of the player's home directory
+
+        :param folder: The folder to keep everything in
+        """
+        Options.SAVE_FOLDER = folder
+        Save.SAVE_FOLDER = f"{folder}/saves"
+        Theme.SAVE_FOLDER = f"{folder}/themes"
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def get_console(self) -> Console:
+        """Returns the Console that the Engine runs commands on"""
+        return self.__console
+
+    def get_save(self) -> Save:
+        """Returns the Save being played"""
+        return self.__console.get_save()
+
+    def get_time(self) -> float:
+        """Returns the amount of in-game seconds that have passed"""
+        return self.__time
+
+    def is_game_over(self) -> bool:
+        """Returns whether or not the Virus has erased every file on the system"""
+        return self.__result == "@game_over"
+
+    def get_result(self) -> Optional[str]:
+        """Returns "@game_over" once the game is lost, "@won" once it is won, or None while it is not over"""
+        return self.__result
+
+    def is_in_play(self) -> bool:
+        """Returns whether or not the game is still being played"""
+        return self.__console.is_in_play()
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def advance(self, seconds: float) -> int:
+        """Lets the in-game time pass and returns how many timers of the Virus fired
+
+        The time stops at every deadline on the way so the Virus deletes a file at
+        each point in time it would have in a real game. When the Engine was given a
+        Scheduler, time passes on the clock of that Scheduler instead and only the
+        timers that are already due are fired.
+
+        :param seconds: The amount of in-game seconds to pass
+        """
+        if not self.__owns_clock:
+            return self.__scheduler.run_due()
+        target = self.__time + seconds
+        fired = 0
+        while True:
+            delay = self.__scheduler.get_next_delay()
+            if delay is None or self.__time + delay > target:
+                break
+            self.__time += delay
+            fired += self.__scheduler.run_due(self.__time)
+        self.__time = target
+        return fired
+
+    def run(self, command: str) -> dict:
+        """Runs a single command and returns its result as a JSON object
+        holding the command, its output, how long it took, and the state of the game after it
+
+        :param command: The command to run, exactly as a player would type it
+        """
+        start = perf_counter()
+        output = self.__console.parse(command)
+        if output is not None and not isinstance(output, str):
+            output = "".join(output)
+        elapsed = perf_counter() - start
+        if output in ["@game_over", "@won"]:
+            self.__result = output
+        elif output == "@main_menu":
+            self.__console.main_menu()
+        if self.__tick and self.__result is None:
+            self.advance(self.__tick)
+        return {
+            "command": command,
+            "output": output,
+            "seconds": elapsed,
+            "directory": str(self.__console.get_current_dir()),
+            "in_play": self.is_in_play(),
+            "game_over": self.is_game_over(),
+            "result": self.__result}
+
+    def run_all(self, commands: Iterable[str]) -> Iterator[dict]:
+        """Runs every command, one after another, and yields the result of each one
+
+        Blank lines are skipped so that a file or stdin can be given as the commands.
+        The commands stop once the game is lost or won, which get_result then tells
+
+        :param commands: The commands to run
+        """
+        for command in commands:
+            if self.__result is not None:
+                return
+            command = command.rstrip("\n")
+            if command.strip():
+                yield self.run(command)
+
+    def stop(self, save: bool = True):
+        """Stops the game and its Virus, and waits for any save of it to finish
+
+        :param save: Whether or not to save the game first, if it is still being played
+        """
+        if save and self.is_in_play():
+            SaveWriter.get_instance().submit(self.get_save())
+        self.__console.main_menu()
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def add_theme(self, _: Theme):
+        """Themes are not shown without a UI"""
+
+    def remove_theme(self, _: Theme):
+        """Themes are not shown without a UI"""
+
+    def on_game_over(self, result: Optional[str]):
+        """Keeps track of the Virus erasing every file on the system"""
+        if result is not None:
+            self.__result = result
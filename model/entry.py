@@ -1,4 +1,5 @@
-from typing import Optional
+from sys import intern
+from typing import Optional, Union
 
 from model.abstract import Serializable, Sizable
 from model.error import InvalidNameError
@@ -14,7 +15,7 @@ class Entry(Serializable, Sizable):
 
     INVALID_CHARS="?&:;|[]*,\""
 
-    # # # # # # # # # # # # # # # # # # # #
+    __slots__ = ("__name", "__parent", "__original_parent")
 
     def __init__(self, name: str, parent: 'Directory' = None):
         for invalid_char in Entry.INVALID_CHARS:
@@ -22,7 +23,8 @@ class Entry(Serializable, Sizable):
                 raise InvalidNameError(f"{invalid_char} cannot exist in entry name.")
         self.__name: str = name
         self.__parent = parent
-        self.__original_parent = str(parent)
+        self.__original_parent: Optional[str] = None
+        self.set_original_parent(parent)
 
     def __str__(self):
         if self.__parent:
@@ -52,14 +54,26 @@ class Entry(Serializable, Sizable):
     def set_name(self, name: str):
         """Sets the name of the Entry"""
         self.__name = name
+        self._invalidate_path()
 
     def set_parent(self, parent: 'Directory'):
         """Sets the parent Directory of this Entry"""
         self.__parent = parent
+        self._invalidate_path()
+
+    def set_original_parent(self, parent: Union['Directory', str, None]):
+        """Sets the original parent Directory of this Entry
 
-    def set_original_parent(self, parent: 'Directory'):
-        """Sets the original parent Directory of this Entry"""
-        self.__original_parent = parent
+        The original parent is kept as its interned path so that it is shared
+        between every Entry that started out in the same Directory
+        """
+        self.__original_parent = intern(str(parent)) if parent is not None else None
+
+    def _invalidate_path(self):
+        """Invalidates the cached path of this Entry after its name or parent changes
+
+        Only Directories cache their path since the path of a file is made from the path of its parent
+        """
 
     # # # # # # # # # # # # # # # # # # # #
 
@@ -71,8 +85,8 @@ class Entry(Serializable, Sizable):
         """Returns the parent Directory of this Entry"""
         return self.__parent
 
-    def get_original_parent(self) -> 'Directory':
-        """Returns the original Directory the Entry started out in
+    def get_original_parent(self) -> Optional[str]:
+        """Returns the path of the original Directory the Entry started out in
         before being deleted"""
         return self.__original_parent
 
@@ -82,25 +96,6 @@ class Entry(Serializable, Sizable):
         """
         return self.__name.startswith(".")
 
-    def restore(self, root: 'Directory') -> Optional['Entry']:
-        """Restores the entry to its original parent
-        when the file was created if the parent was given
-
-        :param root: The root Directory of the entire filesystem which is used to
-            parse through the original parent to set the original parent after the file is restored
-        """
-        if self.get_parent():
-            self.get_parent().remove_entry(self)
-            target = root
-            orig_parent_split = self.__original_parent.split("/")
-            for entry in orig_parent_split[1:]:  # Ignore the root entry since that's where we are at
-                target = target.get_entry(entry)
-                if target is None:
-                    return
-            self.set_parent(target)
-            self.__parent.add_entry(self)
-            return self
-
     # # # # # # # # # # # # # # # # # # # #
 
     def to_json(self) -> dict:
@@ -124,5 +119,5 @@ class Entry(Serializable, Sizable):
         if "name" not in json:
             raise KeyError("\"name\" key must exist to create Entry object")
         entry = Entry(json["name"])
-        entry.__original_parent = json["parent"]
+        entry.set_original_parent(json["parent"])
         return entry
@@ -0,0 +1,344 @@
+from array import array
+from random import Random
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from model import Entry, Directory, NormalFile, VirusFile, TableDirectory
+
+
+class FilesystemTable:
+    """A FilesystemTable holds an entire filesystem tree in flat columns instead
+    of an object per Entry which keeps very large filesystems small in memory
+
+    Every Entry in the table is a node which is its index in each column.
+    Parents are always added before their children, and the root of the
+    filesystem is always node 0.
+
+    The table is not meant to be changed once Directory objects or views have been
+    created from it. Changes are made to those objects instead.
+    """
+
+    DIRECTORY = 0
+    NORMAL_FILE = 1
+    VIRUS_FILE = 2
+
+    def __init__(self):
+        self.__names = bytearray()
+        self.__name_offsets = array("L", [0])
+        self.__parents = array("i")
+        self.__kinds = array("B")
+        self.__sizes = array("L")
+        self.__seeds = array("Q")
+        self.__first_children = array("i")
+        self.__next_siblings = array("i")
+        self.__numbers: Dict[int, int] = {}
+        self.__original_parents: Dict[int, str] = {}
+        self.__aggregates: Optional[Tuple[array, array, array, array]] = None
+
+    def __len__(self) -> int:
+        return len(self.__kinds)
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def __add(self, name: str, parent: int, kind: int, size: int, seed: int) -> int:
+        """Adds a new node to the table and returns it"""
+        node = len(self.__kinds)
+        self.__names += name.encode("utf-8")
+        self.__name_offsets.append(len(self.__names))
+        self.__parents.append(parent)
+        self.__kinds.append(kind)
+        self.__sizes.append(size)
+        self.__seeds.append(seed)
+        self.__first_children.append(-1)
+        if parent != -1:
+            self.__next_siblings.append(self.__first_children[parent])
+            self.__first_children[parent] = node
+        else:
+            self.__next_siblings.append(-1)
+        self.__aggregates = None
+        return node
+
+    def add_directory(self, name: str, parent: int = -1, original_parent: str = None) -> int:
+        """Adds a new Directory to the table and returns its node
+
+        :param name: The name of the Directory
+        :param parent: The node of the parent Directory, or -1 for the root
+        :param original_parent: The path of the original parent Directory if it was moved into the Trash
+        """
+        node = self.__add(name, parent, FilesystemTable.DIRECTORY, 0, 0)
+        if original_parent is not None:
+            self.__original_parents[node] = original_parent
+        return node
+
+    def add_file(self, name: str, parent: int, size: int, seed: int,
+                 number: int = None, original_parent: str = None) -> int:
+        """Adds a new file to the table and returns its node
+
+        :param name: The name of the file
+        :param parent: The node of the parent Directory
+        :param size: The amount of bytes in the file
+        :param seed: The seed that the bytes of the file are generated from
+        :param number: The number of the virus file, if the file is a virus file
+        :param original_parent: The path of the original parent Directory if it is not the parent
+        """
+        kind = FilesystemTable.NORMAL_FILE if number is None else FilesystemTable.VIRUS_FILE
+        node = self.__add(name, parent, kind, size, seed)
+        if number is not None:
+            self.__numbers[node] = number
+        if original_parent is not None:
+            self.__original_parents[node] = original_parent
+        return node
+
+    def add_table(self, table: 'FilesystemTable', parent: int) -> int:
+        """Adds every node of another table below the Directory at the node, in the same order
+        they were added to the other table, and returns the node that the root of the other table became
+
+        :param table: The table to add the nodes of
+        :param parent: The node of the Directory to add the root of the other table into
+        """
+        offset = len(self.__kinds)
+        name_offset = len(self.__names)
+        self.__names += table.__names
+        self.__name_offsets.extend(name_end + name_offset for name_end in table.__name_offsets[1:])
+        self.__parents.extend(parent if node_parent == -1 else node_parent + offset
+                              for node_parent in table.__parents)
+        self.__kinds += table.__kinds
+        self.__sizes += table.__sizes
+        self.__seeds += table.__seeds
+        self.__first_children.extend(-1 if child == -1 else child + offset for child in table.__first_children)
+        self.__next_siblings.extend(-1 if sibling == -1 else sibling + offset for sibling in table.__next_siblings)
+        self.__numbers.update((node + offset, number) for node, number in table.__numbers.items())
+        self.__original_parents.update((node + offset, original_parent)
+                                       for node, original_parent in table.__original_parents.items())
+
+        # The root of the other table becomes the first child of the parent, like any other node that is added
+        self.__next_siblings[offset] = self.__first_children[parent]
+        self.__first_children[parent] = offset
+        self.__aggregates = None
+        return offset
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def get_name(self, node: int) -> str:
+        """Returns the name of the node"""
+        return self.__names[self.__name_offsets[node]:self.__name_offsets[node + 1]].decode("utf-8")
+
+    def get_parent(self, node: int) -> int:
+        """Returns the node of the parent Directory of the node, or -1 for the root"""
+        return self.__parents[node]
+
+    def get_size(self, node: int) -> int:
+        """Returns the size of the file at the node"""
+        return self.__sizes[node]
+
+    def get_seed(self, node: int) -> int:
+        """Returns the seed of the file at the node"""
+        return self.__seeds[node]
+
+    def get_number(self, node: int) -> Optional[int]:
+        """Returns the number of the virus file at the node"""
+        return self.__numbers.get(node)
+
+    def get_children(self, node: int) -> Iterator[int]:
+        """Returns an iterator over the nodes inside the Directory at the node"""
+        child = self.__first_children[node]
+        while child != -1:
+            yield child
+            child = self.__next_siblings[child]
+
+    def has_children(self, node: int) -> bool:
+        """Returns whether or not the Directory at the node has any nodes inside it"""
+        return self.__first_children[node] != -1
+
+    def get_child(self, node: int, name: str) -> Optional[int]:
+        """Returns the node with the specified name inside the Directory at the node"""
+        for child in self.get_children(node):
+            if self.get_name(child) == name:
+                return child
+
+    def get_path(self, node: int) -> str:
+        """Returns the full path of the node"""
+        names = []
+        while node != -1:
+            names.append(self.get_name(node))
+            node = self.__parents[node]
+        return "/".join(reversed(names))
+
+    def get_original_parent(self, node: int) -> str:
+        """Returns the path of the Directory the file at the node started out in"""
+        original_parent = self.__original_parents.get(node)
+        if original_parent is None:
+            original_parent = self.get_path(self.__parents[node])
+        return original_parent
+
+    def get_aggregates(self, node: int) -> Tuple[int, int, int, int]:
+        """Returns a 4-tuple of the size, normal file count, virus file count and directory count
+        of the subtree below the Directory at the node
+        """
+        if self.__aggregates is None:
+            self.__aggregates = self.__compute_aggregates()
+        sizes, normal_files, virus_files, directories = self.__aggregates
+        return sizes[node], normal_files[node], virus_files[node], directories[node]
+
+    def __compute_aggregates(self) -> Tuple[array, array, array, array]:
+        """Computes the aggregates of every node in a single pass from the last node to the first
+        which works since every node is added after its parent
+        """
+        total = len(self.__kinds)
+        sizes = array("Q", [0]) * total
+        normal_files = array("L", [0]) * total
+        virus_files = array("L", [0]) * total
+        directories = array("L", [0]) * total
+        for node in range(total - 1, 0, -1):
+            parent = self.__parents[node]
+            kind = self.__kinds[node]
+            if kind == FilesystemTable.DIRECTORY:
+                sizes[parent] += sizes[node]
+                normal_files[parent] += normal_files[node]
+                virus_files[parent] += virus_files[node]
+                directories[parent] += directories[node] + 1
+            else:
+                sizes[parent] += self.__sizes[node]
+                if kind == FilesystemTable.VIRUS_FILE:
+                    virus_files[parent] += 1
+                else:
+                    normal_files[parent] += 1
+        return sizes, normal_files, virus_files, directories
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def choose_random_directory(self, node: int, rng: Random) -> int:
+        """Returns a random Directory node from whatever depth starting off at the
+        specified Directory node, the same way choose_random_directory does for Directory objects
+        """
+        while rng.randint(1, 100) % 10 != 0:  # This results in an 90% chance that a directory is chosen
+            directories = [child for child in self.get_children(node)
+                           if self.__kinds[child] == FilesystemTable.DIRECTORY]
+            if not directories:
+                break
+            node = rng.choice(directories)
+        return node
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def create_entry(self, node: int, parent: Directory = None, lazy: bool = True) -> Entry:
+        """Creates the Entry object for the node
+
+        :param node: The node to create the Entry for
+        :param parent: The parent Directory of the Entry
+        :param lazy: Whether a Directory should be a TableDirectory view which creates its
+            Entries when they are first used, or a Directory with all of its Entries created
+        """
+        kind = self.__kinds[node]
+        if kind == FilesystemTable.DIRECTORY:
+            if lazy:
+                directory = TableDirectory(self, node, parent)
+            else:
+                directory = Directory(self.get_name(node), parent=parent)
+                directory.add_entries(*self.create_entries(node, directory, False))
+            directory.set_original_parent(self.__original_parents.get(node))
+            return directory
+        if kind == FilesystemTable.VIRUS_FILE:
+            entry = VirusFile(self.__numbers[node], self.get_name(node), parent,
+                              self.__sizes[node], self.__seeds[node])
+        else:
+            entry = NormalFile(self.get_name(node), parent, self.__sizes[node], self.__seeds[node])
+        entry.set_original_parent(self.get_original_parent(node))
+        return entry
+
+    def create_entries(self, node: int, parent: Directory, lazy: bool = True) -> List[Entry]:
+        """Creates the Entry objects inside of the Directory at the node
+
+        :param node: The node of the Directory
+        :param parent: The Directory object that the Entries belong to
+        :param lazy: Whether child Directories should be TableDirectory views
+        """
+        return [self.create_entry(child, parent, lazy) for child in self.get_children(node)]
+
+    def get_view(self, node: int = 0) -> TableDirectory:
+        """Returns a TableDirectory view over the Directory at the node"""
+        return TableDirectory(self, node)
+
+    def to_directory(self, node: int = 0) -> Directory:
+        """Returns the Directory at the node with every Entry below it created"""
+        return self.create_entry(node, lazy=False)
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def to_json(self, node: int = 0) -> dict:
+        """Returns the same JSON object that Directory.to_json returns for the Directory at the node"""
+        entries = []
+        for child in sorted(self.get_children(node), key=self.get_name):
+            kind = self.__kinds[child]
+            if kind == FilesystemTable.DIRECTORY:
+                entries.append(self.to_json(child))
+            elif kind == FilesystemTable.VIRUS_FILE:
+                entries.append({
+                    "type": "VirusFile",
+                    "number": self.__numbers[child],
+                    "name": self.get_name(child),
+                    "size": self.__sizes[child],
+                    "seed": self.__seeds[child]})
+            else:
+                entries.append({
+                    "type": "NormalFile",
+                    "name": self.get_name(child),
+                    "parent": self.get_original_parent(child),
+                    "size": self.__sizes[child],
+                    "seed": self.__seeds[child]})
+        json = {
+            "type": "Directory",
+            "name": self.get_name(node),
+            "entries": entries}
+        if node in self.__original_parents:
+            json["parent"] = self.__original_parents[node]
+        return json
+
+    @staticmethod
+    def from_json(json: dict) -> 'FilesystemTable':
+        """Converts the JSON object of a Directory into a FilesystemTable
+        without creating an object for any of its Entries
+
+        :param json: The JSON object to convert
+        :raises TypeError: When json.type is not 'Directory'
+        :raises KeyError: When the name of a Directory or file is not specified in the JSON object
+        :raises ValueError: When an Entry in the Directory is of an unknown type
+        """
+        table = FilesystemTable()
+        table.__add_json(json, -1, "")
+        return table
+
+    def __add_json(self, json: dict, parent: int, parent_path: str):
+        """Adds the Directory in the JSON object, and everything below it, to the table"""
+        if json["type"] != "Directory":
+            raise TypeError(f"Type of JSON object must match (\"{json['type']}\" != \"Directory\")")
+        if "name" not in json:
+            raise KeyError("\"name\" key must exist to create Directory object")
+
+        directory = self.add_directory(json["name"], parent, json.get("parent"))
+        path = f"{parent_path}/{json['name']}" if parent != -1 else json["name"]
+        for entry in json.get("entries", []):
+            if entry["type"] == "Directory":
+                self.__add_json(entry, directory, path)
+                continue
+            if "name" not in entry:
+                raise KeyError(f"\"name\" key must exist to create {entry['type']} object")
+            if entry["type"] == "VirusFile":
+                seed = entry.get("seed")
+                if seed is None:
+                    seed = NormalFile.derive_seed(0, f"{entry['number']}/{entry['name']}")
+                size = entry.get("size")
+                if size is None:
+                    size = NormalFile.derive_size(seed)
+                self.add_file(entry["name"], directory, size, seed, number=entry["number"])
+            elif entry["type"] == "NormalFile":
+                seed = entry.get("seed")
+                if seed is None:
+                    seed = NormalFile.derive_seed(0, f"{entry['parent']}/{entry['name']}")
+                size = entry.get("size")
+                if size is None:
+                    size = NormalFile.derive_size(seed)
+                original_parent = entry.get("parent")
+                self.add_file(entry["name"], directory, size, seed,
+                              original_parent=original_parent if original_parent != path else None)
+            else:
+                raise ValueError(f"\"{entry['type']}\" not recognized as an Entry type")
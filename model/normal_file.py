@@ -1,5 +1,6 @@
-from random import randint
-from typing import List, TYPE_CHECKING
+from hashlib import blake2b
+from random import Random
+from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from model import Directory
 
@@ -10,19 +11,40 @@ class NormalFile(Entry):
     """The NormalFile class is the structure that acts as a File on the
     file system that has lines of data inside it
 
+    The bytes of a NormalFile are not stored but are generated from its seed
+    whenever they are needed so they stay the same across saves and loads
+
     :param name: The name to give to the File
     :param parent: The parent Directory of this NormalFile
+    :param size: The amount of bytes in the File
+    :param seed: The seed that the bytes of the File are generated from
     """
 
     MINIMUM_SIZE = 40
     MAXIMUM_SIZE = 100
 
-    def __init__(self, name: str, parent: 'Directory' = None, size: int = None):
+    __slots__ = ("__size", "__seed")
+
+    @staticmethod
+    def derive_seed(seed: int, path: str) -> int:
+        """Returns the seed for the file at the specified path in a game
+        that was generated with the specified seed
+        """
+        return int.from_bytes(blake2b(f"{seed}:{path}".encode(), digest_size=8).digest(), "big")
+
+    @staticmethod
+    def derive_size(seed: int) -> int:
+        """Returns the size of a file whose size was not given, derived from the seed of the file"""
+        return NormalFile.MINIMUM_SIZE + seed % (NormalFile.MAXIMUM_SIZE - NormalFile.MINIMUM_SIZE + 1)
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def __init__(self, name: str, parent: 'Directory' = None, size: int = None, seed: int = None):
         super().__init__(name, parent)
-        self.__size = randint(NormalFile.MINIMUM_SIZE, NormalFile.MAXIMUM_SIZE) if size is None else size
-        self._file_bytes = []
-        for byte in range(self.__size):
-            self._file_bytes.append(randint(0, 255))
+        if seed is None:
+            seed = NormalFile.derive_seed(0, str(self))
+        self.__size = NormalFile.derive_size(seed) if size is None else size
+        self.__seed = seed
 
     # # # # # # # # # # # # # # # # # # # #
 
@@ -30,9 +52,13 @@ class NormalFile(Entry):
         """Returns the size of this File (in bytes)"""
         return self.__size
 
-    def get_bytes(self) -> List[int]:
+    def get_seed(self) -> int:
+        """Returns the seed that the bytes of this File are generated from"""
+        return self.__seed
+
+    def get_bytes(self) -> bytes:
         """Returns the bytes of this file"""
-        return list(self._file_bytes)
+        return Random(self.__seed).randbytes(self.__size)
 
     # # # # # # # # # # # # # # # # # # # #
 
@@ -41,7 +67,8 @@ class NormalFile(Entry):
             "type": "NormalFile",
             "name": self.get_name(),
             "parent": self.get_original_parent(),
-            "size": self.get_size()}
+            "size": self.get_size(),
+            "seed": self.get_seed()}
 
     # # # # # # # # # # # # # # # # # # # #
 
@@ -49,6 +76,8 @@ class NormalFile(Entry):
     def from_json(json: dict):
         """Converts a JSON object into a NormalFile object
 
+        Files saved before seeds were stored have their seed derived from their original path
+
         :param json: The JSON object to convert
         :raises TypeError: When json.type is not 'NormalFile'
         :raises KeyError: When the NormalFile's name is not specified in the JSON object
@@ -58,6 +87,9 @@ class NormalFile(Entry):
         if "name" not in json:
             raise KeyError("\"name\" key must exist to create NormalFile object")
 
-        file_obj = NormalFile(json["name"], size=json.get("size"))
+        seed = json.get("seed")
+        if seed is None:
+            seed = NormalFile.derive_seed(0, f"{json['parent']}/{json['name']}")
+        file_obj = NormalFile(json["name"], size=json.get("size"), seed=seed)
         file_obj.set_original_parent(json["parent"])
         return file_obj
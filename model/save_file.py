@@ -14,10 +14,12 @@ class SaveFile(NormalFile):
     :param parent: The parent Directory (which should be given the game save directory)
     """
 
+    __slots__ = ("__data",)
+
     def __init__(self, name: str, data: str, parent: 'Directory' = None):
         super().__init__(name, parent)
-        self._file_bytes = data
+        self.__data = data
 
     def get_bytes(self) -> str:
         """Returns the basic data/stats specified by the Save file data"""
-        return self._file_bytes
+        return self.__data
@@ -0,0 +1,102 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+    from model.util import FilesystemStore
+
+from model import Entry, Directory, NormalFile
+
+
+class StoreDirectory(Directory):
+    """A StoreDirectory is a Directory that is a view over a record of a FilesystemStore
+
+    The Entries inside of the Directory are only read from the store on disk the first
+    time they are used. Until then, the Directory only holds the number of its record
+    and the aggregates of its subtree.
+
+    :param store: The FilesystemStore that holds the record of the Directory
+    :param record: The number of the record of the Directory
+    :param name: The name of the Directory
+    :param aggregates: The size, normal file count, virus file count and directory count of the Directory
+    :param parent: The parent Directory of this Directory
+    """
+
+    __slots__ = ("__store", "__record")
+
+    def __init__(self, store: 'FilesystemStore', record: int, name: str,
+                 aggregates: Tuple[int, int, int, int], parent: Directory = None):
+        super().__init__(name, parent=parent)
+        self.__store = store
+        self.__record: Optional[int] = record
+        self._set_aggregates(*aggregates)
+
+    def __materialize(self):
+        """Reads the Entries of this Directory from the store if they have not been read yet"""
+        if self.__record is not None:
+            record, self.__record = self.__record, None
+            self._load_entries(self.__store.create_entries(record, self))
+
+    def is_materialized(self) -> bool:
+        """Returns whether or not the Entries of this Directory have been read from the store"""
+        return self.__record is None
+
+    def _get_record(self) -> Optional[int]:
+        """Returns the number of the record of this Directory, or None if its Entries have been read"""
+        return self.__record
+
+    def _set_record(self, record: int):
+        """Sets the number of the record of this Directory once its store holds a new snapshot
+
+        :param record: The number of the record of this Directory in the new snapshot
+        """
+        self.__record = record
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def get_entry(self, entry: str) -> Optional[Entry]:
+        self.__materialize()
+        return super().get_entry(entry)
+
+    def get_entries(self) -> Tuple[Entry, ...]:
+        self.__materialize()
+        return super().get_entries()
+
+    def get_files(self) -> List[NormalFile]:
+        self.__materialize()
+        return super().get_files()
+
+    def get_directories(self) -> List[Directory]:
+        self.__materialize()
+        return super().get_directories()
+
+    def is_populated(self):
+        if self.__record is not None:
+            return self.get_normal_file_count() + self.get_virus_file_count() + self.get_directory_count() > 0
+        return super().is_populated()
+
+    def add_entry(self, entry: Entry) -> bool:
+        self.__materialize()
+        return super().add_entry(entry)
+
+    def remove_entry(self, entry: Union[int, str, Entry], recursive: bool = False) -> Optional[Entry]:
+        self.__materialize()
+        return super().remove_entry(entry, recursive)
+
+    def add_entries(self, *entries: Entry) -> List[Entry]:
+        self.__materialize()
+        return super().add_entries(*entries)
+
+    def remove_entries(self, entries: Iterable[Entry], recursive: bool = False) -> List[Entry]:
+        self.__materialize()
+        return super().remove_entries(entries, recursive)
+
+    def _copy(self, copies: Dict[int, Union[tuple, Callable]]):
+        if self.__record is None:
+            super()._copy(copies)
+            return
+        store, record = self.__store, self.__record
+        json = self._add_original_parent({"name": self.get_name()})
+
+        def to_json(records: Dict[int, int] = None) -> dict:
+            record_json = store.to_json(record, records)
+            record_json.update(json)
+            return record_json
+        copies[id(self)] = to_json
@@ -0,0 +1,89 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+    from model import FilesystemTable
+
+from model import Entry, Directory, NormalFile
+
+
+class TableDirectory(Directory):
+    """A TableDirectory is a Directory that is a view over a node of a FilesystemTable
+
+    The Entries inside of the Directory are only created from the table the first time
+    they are used. Until then, the Directory only holds its node in the table
+    and the aggregates of its subtree.
+
+    :param table: The FilesystemTable that holds the Directory
+    :param node: The node of the Directory in the table
+    :param parent: The parent Directory of this Directory
+    """
+
+    __slots__ = ("__table", "__node")
+
+    def __init__(self, table: 'FilesystemTable', node: int, parent: Directory = None):
+        super().__init__(table.get_name(node), parent=parent)
+        self.__table = table
+        self.__node: Optional[int] = node
+        self._set_aggregates(*table.get_aggregates(node))
+
+    def __materialize(self):
+        """Creates the Entries of this Directory from the table if they have not been created yet"""
+        if self.__node is not None:
+            node, self.__node = self.__node, None
+            self._load_entries(self.__table.create_entries(node, self))
+
+    def is_materialized(self) -> bool:
+        """Returns whether or not the Entries of this Directory have been created from the table"""
+        return self.__node is None
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def get_entry(self, entry: str) -> Optional[Entry]:
+        self.__materialize()
+        return super().get_entry(entry)
+
+    def get_entries(self) -> Tuple[Entry, ...]:
+        self.__materialize()
+        return super().get_entries()
+
+    def get_files(self) -> List[NormalFile]:
+        self.__materialize()
+        return super().get_files()
+
+    def get_directories(self) -> List[Directory]:
+        self.__materialize()
+        return super().get_directories()
+
+    def is_populated(self):
+        if self.__node is not None:
+            return self.__table.has_children(self.__node)
+        return super().is_populated()
+
+    def add_entry(self, entry: Entry) -> bool:
+        self.__materialize()
+        return super().add_entry(entry)
+
+    def remove_entry(self, entry: Union[int, str, Entry], recursive: bool = False) -> Optional[Entry]:
+        self.__materialize()
+        return super().remove_entry(entry, recursive)
+
+    def add_entries(self, *entries: Entry) -> List[Entry]:
+        self.__materialize()
+        return super().add_entries(*entries)
+
+    def remove_entries(self, entries: Iterable[Entry], recursive: bool = False) -> List[Entry]:
+        self.__materialize()
+        return super().remove_entries(entries, recursive)
+
+    def _copy(self, copies: Dict[int, Union[tuple, Callable]]):
+        if self.__node is None:
+            super()._copy(copies)
+            return
+        table, node = self.__table, self.__node
+        json = self._add_original_parent({"name": self.get_name()})
+
+        def to_json(records: Dict[int, int] = None) -> dict:
+            node_json = table.to_json(node)
+            node_json.pop("parent", None)
+            node_json.update(json)
+            return node_json
+        copies[id(self)] = to_json
@@ -1,6 +1,15 @@
 from .hexable import Hexable
-from .filesystem import generate_filesystem, choose_random_file, choose_random_directory, generate_virus
+from .filesystem import generate_filesystem, generate_table, choose_random_file, choose_random_directory, generate_virus
+from .filesystem import OBJECT_BACKEND, TABLE_BACKEND, LEGACY_SAMPLING, UNIFORM_SAMPLING, DEPTH_WEIGHTED_SAMPLING
+from .journal import Journal
+from .deletion_log import DeletionLog
+from .virus_tracker import VirusTracker
+from .filesystem_store import FilesystemStore
 from .save import Save
+from .save_writer import SaveWriter
 from .options import Options
+from .scheduler import Scheduler
+from .hex_dump import HexDump
+from .glob_matcher import GlobMatcher
 from .command import ls, cd, cat, rm, track, trace, mntr, restore, tut, help_command
 from .virus import Virus
@@ -1,20 +1,25 @@
-from typing import List
+from time import time
+from typing import Iterator, List
 
 from model import Entry, Directory, NormalFile, VirusFile
+from model.util import GlobMatcher, HexDump
 
 
 def __dir_arg_parse(directory: Directory, directory_path: str) -> Entry:
     """Parses a concatenated directory path to return the proper target
     which may be a file or directory
     """
-    dir_split = directory_path.split("/")
-    for target in dir_split:
-        if target == "..":
-            if directory.get_parent():
-                directory = directory.get_parent()
-        elif directory.get_name() != target and target != ".":
-            directory = directory.get_entry(target)
-    return directory
+    return directory.resolve(directory_path)
+
+
+def __has_no_files(directory: Directory) -> bool:
+    """Returns whether or not there are no files anywhere below the Directory"""
+    return directory.get_normal_file_count() + directory.get_virus_file_count() == 0
+
+
+def __has_no_virus_files(directory: Directory) -> bool:
+    """Returns whether or not there are no virus files anywhere below the Directory"""
+    return directory.get_virus_file_count() == 0
 
 
 def ls(console, args):
@@ -41,11 +46,15 @@ def ls(console, args):
     # List the results
     if len(targets) == 0:
         return console.get_current_dir().list_contents(options["show_hidden"]["value"])
-    results = []
+    matches = []
     for target in targets:
-        current_dir = __dir_arg_parse(console.get_current_dir(), target)
+        found = GlobMatcher.get_instance().expand(
+            console.get_current_dir(), target, options["show_hidden"]["value"])
+        matches.extend(found if found else [(target, None)])
+    results = []
+    for target, current_dir in matches:
         if current_dir:
-            if len(targets) > 1:
+            if len(matches) > 1:
                 results.append(f"{target}{':' if isinstance(current_dir, Directory) else ''}")
             if isinstance(current_dir, Directory):
                 results.append(current_dir.list_contents(options["show_hidden"]["value"]))
@@ -59,104 +68,138 @@ def cd(console, args):
     if len(args) > 1:
         return "usage: cd <directory>"
     if len(args) == 0:
-        usr_dir = console.get_root().get_entry("usr")
         username = console.get_save().get_username()
-        console.set_current_dir(usr_dir.get_entry(username))
+        home_dir = console.get_root().resolve(f"usr/{username}")
+        if not isinstance(home_dir, Directory):
+            return f"cd: usr/{username}: No such file or directory"
+        console.set_current_dir(home_dir)
         return
 
-    target = args[0].split("/")
-    for tgt in target:
-        current_dir = console.get_current_dir()
-        if tgt == ".":
-            continue
-        elif tgt == "..":
-            if (console.is_in_play() or console.is_in_tutorial()) and current_dir == console.get_save().get_trash():
-                console.set_current_dir(console.get_previous_dir())
-            elif current_dir.get_parent():
-                console.set_current_dir(current_dir.get_parent())
-            continue
-        elif tgt == "Trash" and (console.is_in_play() or console.is_in_tutorial()):
-            console.set_previous_dir(console.get_current_dir())
-            if console.is_in_play():
-                console.set_current_dir(console.get_save().get_trash())
-            elif console.is_in_tutorial():
-                console.set_current_dir(console.get_tutorial_trash())
+    path = args[0]
+    if console.is_in_play() or console.is_in_tutorial():
+        trash = console.get_save().get_trash() if console.is_in_play() else console.get_tutorial_trash()
+
+        # The Trash directory lives outside of the filesystem so it can only be entered directly
+        #   and leaving it brings the player back to the directory they entered it from
+        if path.rstrip("/") in ["Trash", "./Trash"]:
+            if console.get_current_dir() is not trash:
+                console.set_previous_dir(console.get_current_dir())
+                console.set_current_dir(trash)
             return
-        found = False
-        for entry in current_dir.get_entries():
-            if entry.get_name() == tgt:
-                if isinstance(entry, Directory):
-                    found = True
-                    console.set_current_dir(entry)
-                else:
-                    return f"cd: not a directory: {tgt}"
-        if not found:
-            return f"cd: {tgt}: No such file or directory"
+        if console.get_current_dir() is trash and (path == ".." or path.startswith("../")):
+            console.set_current_dir(console.get_previous_dir())
+            path = path[3:]
+
+    target = console.get_current_dir().resolve(path)
+    if target is None:
+        return f"cd: {path}: No such file or directory"
+    if not isinstance(target, Directory):
+        return f"cd: not a directory: {path}"
+    console.set_current_dir(target)
 
 
 def cat(console, args):
     if len(args) == 0:
         return "usage: cat <file(s)>"
 
-    result = []
-    for file in args:
-        file = __dir_arg_parse(console.get_current_dir(), file)
+    # The files are found now, while the filesystem is held, but only rendered
+    #   as the output is read since the bytes of a file never change
+    outputs = []
+    for pattern in args:
+        matches = GlobMatcher.get_instance().expand(console.get_current_dir(), pattern, prune=__has_no_files)
+
+        # Directories matched by a wildcard are skipped so every file that matched is shown
+        if GlobMatcher.has_magic(pattern):
+            outputs.extend(file for _, file in matches if not isinstance(file, Directory))
+            continue
+        file = matches[0][1] if matches else None
         if file:
             if isinstance(file, Directory):
-                result.append(f"cat: {file.get_name()}: Is a directory")
+                outputs.append(f"cat: {file.get_name()}: Is a directory")
                 break
             else:
-                file_result = ""
-                total = 0
-                for byte in file.get_bytes():
-                    file_result += f"{hex(byte)[2:].rjust(2, '0')} "
-                    total += 1
-                    if total % 16 == 0:
-                        file_result += "\n"
-                result.append(file_result)
-    return "\n".join(result)
+                outputs.append(file)
+    return HexDump.get_instance().stream(outputs)
 
 
 def rm(console, args):
     if len(args) == 0:
         return "usage: rm [-r] file ..."
 
-    recursive = "-r" in args or (len(args) > 0 and args[0].startswith("-") and "r" in args[0])
+    options = [arg for arg in args if arg.startswith("-")]
+    recursive = any("r" in option for option in options)
+    targets = [arg for arg in args if not arg.startswith("-")]
+    if len(targets) == 0 or console.get_root() is None:
+        return "usage: rm [-r] file ..."
 
-    target = None
-    for entry in console.get_current_dir().get_entries():
-        if entry.get_name() == args[-1]:
-            target = entry
-    if not target or console.get_root() is None:
-        return f"rm: {args[-1]}: No such file or directory"
+    # Everything that is deleted is moved into the Trash in a single batch once every target is found
+    messages = []
+    removed = []
+    for name in targets:
+        matches = GlobMatcher.get_instance().expand(console.get_current_dir(), name)
+        if not matches:
+            messages.append(f"rm: {name}: No such file or directory")
+        for _, target in matches:
+
+            # The current Directory, and every Directory above it, can never be removed
+            if __is_above(target, console.get_current_dir()):
+                messages.append(f"rm: {name}: cannot remove the current directory or a directory above it")
+
+            # The wrong virus file was deleted
+            elif isinstance(target, VirusFile):
+                if target.get_number() != console.get_save().get_virus_files()[0] + 1:
+                    console.get_save().increase_speed(target)
+                    messages.append("rm: Incorrect virus file deleted: File moved to new location; New file spawned")
+                else:
+                    console.get_save().remove_virus(target)
+                    messages.append(f"rm: Successful deletion: {target} removed")
+
+            elif isinstance(target, Directory):
+                if target.is_populated() and not recursive:
+                    messages.append(f"rm: {target.get_name()}: is a directory")
+                else:
+                    removed.extend(__rm_helper(target))
+
+            else:
+                removed.append(target)
+
+    # A pattern can match both a Directory and the Entries inside of it, which are moved along with it
+    removed_ids = {id(entry) for entry in removed}
+    rejected = console.get_save().delete_entries(
+        entry for entry in removed if not any(id(parent) in removed_ids for parent in __parents_of(entry)))
+    for entry in rejected:
+        messages.append(f"rm: {entry.get_name()}: already exists in Trash")
+    if messages:
+        return "\n".join(messages)
 
-    # The wrong virus file was deleted
-    if isinstance(target, VirusFile):
-        if target.get_number() != console.get_save().get_virus_files()[0] + 1:
-            console.get_save().increase_speed(target)
-            return "rm: Incorrect virus file deleted: File moved to new location; New file spawned"
-        else:
-            console.get_save().remove_virus(target)
-            return f"rm: Successful deletion: {target} removed"
 
-    else:
-        removed = __rm_helper(target, recursive)
-        console.get_current_dir().remove_entry(target)
-        for entry in removed:
-            entry.set_parent(console.get_trash())
-        console.get_trash().add_entries(removed)
+def __parents_of(entry: Entry) -> Iterator[Directory]:
+    """Returns an iterator over every Directory above the Entry"""
+    parent = entry.get_parent()
+    while parent is not None:
+        yield parent
+        parent = parent.get_parent()
 
 
-def __rm_helper(directory: Directory, recursive: bool = True) -> List[Entry]:
+def __is_above(entry: Entry, directory: Directory) -> bool:
+    """Returns whether or not the Entry is the Directory or any Directory above it"""
+    return entry is directory or any(parent is entry for parent in __parents_of(directory))
+
+
+def __rm_helper(directory: Directory) -> List[Entry]:
+    """Returns the Entries that are moved into the Trash to remove the Directory
+
+    A Directory without any virus files below it is moved as a whole. Otherwise, the virus files
+    stay where they are, along with every Directory above them, and everything else is moved
+    """
+    if directory.get_virus_file_count() == 0:
+        return [directory]
     removed = []
     for entry in directory.get_entries():
         if isinstance(entry, Directory):
-            if entry.get_size() == 0 or recursive:
-                removed.append(entry)
-        elif isinstance(entry, NormalFile):
+            removed.extend(__rm_helper(entry))
+        elif not isinstance(entry, VirusFile):
             removed.append(entry)
-    for entry in removed:
-        directory.remove_entry(entry)
     return removed
 
 
@@ -167,20 +210,23 @@ def restore(console, args):
     if console.get_current_dir() != console.get_trash():
         return "restore: must be in Trash directory"
 
-    if len(args) == 1 and args[0] == "*":
-        args = [entry.get_name() for entry in console.get_trash().get_entries()]
+    # Wildcards match hidden files too since everything in the Trash was deleted by the player or the Virus
+    matches = []
+    for arg in args:
+        found = GlobMatcher.get_instance().expand(console.get_trash(), arg, show_hidden=True)
+        matches.extend(found if found else [(arg, None)])
+    restored = {id(entry) for entry in console.get_save().restore_entries(
+        entry for _, entry in matches if isinstance(entry, (NormalFile, Directory)))}
     result = []
-    for entry in args:
-        file = __dir_arg_parse(console.get_trash(), entry)
-        if file:
-            if isinstance(file, NormalFile):
-                file = file.restore(console.get_root())
-                console.get_save().restored_file()
-                result.append(f"{file.get_name()} restored to {str(file)}")
-            else:
-                result.append(f"restore: {file.get_name()}: is not a valid file")
+    for arg, entry in matches:
+        if entry is None:
+            result.append(f"restore: {arg}: No such file")
+        elif not isinstance(entry, (NormalFile, Directory)):
+            result.append(f"restore: {entry.get_name()}: is not a valid file")
+        elif id(entry) in restored:
+            result.append(f"{entry.get_name()} restored to {str(entry)}")
         else:
-            result.append(f"restore: {entry}: No such file")
+            result.append(f"restore: {entry.get_name()}: cannot be restored to its original directory")
     return "\n".join(result)
 
 
@@ -197,10 +243,10 @@ def trace(console, args):
                 if isinstance(file, Directory):
                     result.append(f"trace: {file.get_name()}: Is a directory")
                     continue
-                else:
-                    for log in console.get_save().get_deletion_log():
-                        if file.get_name() == log[1].split("/")[-1]:
-                            result.append(log[2])
+                elif file.get_original_parent() is not None:
+                    path = f"{file.get_original_parent()}/{file.get_name()}"
+                    for log in console.get_save().get_deletion_log().find_by_path(path):
+                        result.append(log[2])
         return "\n".join(result)
 
 
@@ -211,21 +257,22 @@ def mntr(console, args):
     save = console.get_save()
     log = save.get_deletion_log()
     speed = save.get_speed()
-    result = "last log entry: {}\nspeed: {}s\nvirus files deleted: {}\nfiles deleted by virus: {}"
+    now = time()
+    result = ("last log entry: {}\nspeed: {}s\nvirus files deleted: {}\nfiles deleted by virus: {}\n" +
+              "files deleted in the last minute: {}")
     return result.format(
         log[-1][1]
         if len(log) != 0
         else "None found", speed,
-        save.get_virus_files()[0], save.get_normal_files()[0])
+        save.get_virus_files()[0], save.get_normal_files()[0],
+        len(log.find_between(now - 60, now)))
 
 
 def track(console, args):
     if len(args) == 0:
-        tracked_files = console.get_save().get_tracked_files()
         return "\n".join([
-            f"{i + 1}: {tracked_files[i]}"
-            for i in range(len(tracked_files))
-            if tracked_files[i] is not None
+            f"{number}: {path}"
+            for number, path in console.get_save().get_tracked_files()
         ])
     elif len(args) % 2 != 0:
         return "usage: track [<number> <file> ...]"
@@ -241,11 +288,20 @@ def track(console, args):
     for i in range(len(targets)):
         target = targets[i]
         target_number = target_numbers[i]
-        tgt = __dir_arg_parse(console.get_current_dir(), target)
+        matches = [tgt for _, tgt in GlobMatcher.get_instance().expand(
+            console.get_current_dir(), target, prune=__has_no_virus_files)]
+
+        # A wildcard has to match a single virus file since each number tracks only one
+        if GlobMatcher.has_magic(target):
+            matches = [tgt for tgt in matches if isinstance(tgt, VirusFile)]
+            if len(matches) > 1:
+                messages.append(f"track: {target}: matches more than one virus file")
+                continue
+        tgt = matches[0] if matches else None
         messages.append("track: {}".format(
             f"{tgt} tracked"
             if tgt is not None
-            else f"{tgt}: No such file or directory"))
+            else f"{target}: No such file or directory"))
         if tgt:
             console.get_save().track_virus(target_number, tgt)
     return "\n".join(messages)
@@ -266,6 +322,8 @@ def help_command():
             "\tIf nothing is given, it will show you the files you're tracking currently.\n" +
             "trace <file> -> (Can only be used in the Trash directory) Allows you to trace where a file was deleted from\n" +
             "mntr -> Shows you the most recently deleted file, the speed at which files are deleted by the virus, how\n" +
-            "\tmany virus files you've deleted, and how many files have been deleted by the virus.\n" +
+            "\tmany virus files you've deleted, how many files have been deleted by the virus,\n" +
+            "\tand how many of them were deleted in the last minute.\n" +
             "restore <file> -> Restores a file to its original location (Can only be used in the Trash directory)\n" +
-            "help -> Shows this help message!")
+            "help -> Shows this help message!\n" +
+            "Files can also be given as patterns with *, ?, [...] and ** (every directory below), like **/*.sh")
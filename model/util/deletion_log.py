@@ -0,0 +1,178 @@
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Set, Tuple
+
+from model.util import Hexable
+
+
+class DeletionLog(Sequence):
+    """A DeletionLog holds every file that the Virus has deleted, in the order they were deleted,
+    as a read-only sequence of (virus id, path of the file, location of the virus file) tuples
+
+    The log is held in columns, and indexed by the full path of each file so the trace command
+    never has to scan the whole log. The time of each deletion is kept too, which is always increasing
+    so the mntr command searches it directly.
+    Each entry whose file has been restored is marked, so a file is only counted as restored
+    as many times as the Virus deleted it.
+
+    The log file is append-only: each save appends the entries added since the last save as a single
+    record of columns, along with the index of its first entry. A record that starts before the end
+    of the records read so far replaces everything after its start, which is how a log that was
+    written further than its game save, because the game stopped in between, is corrected.
+    """
+
+    def __init__(self):
+        self.__virus_ids = array("L")
+        self.__paths: List[str] = []
+        self.__locations: List[str] = []
+        self.__times = array("d")
+        self.__restored: Set[int] = set()
+        self.__persisted = 0
+
+        self.__by_path: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__virus_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.__virus_ids[index], self.__paths[index], self.__locations[index]
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def find_by_path(self, path: str) -> List[Tuple[int, str, str]]:
+        """Returns the entries of the file at the specified path
+
+        :param path: The full path of the file when it was deleted
+        """
+        return [self[index] for index in self.__by_path.get(path, ())]
+
+    def find_between(self, start: float, end: float) -> List[Tuple[int, str, str]]:
+        """Returns the entries logged between two times, inclusive
+
+        :param start: The earliest time, in seconds since the epoch
+        :param end: The latest time, in seconds since the epoch
+        """
+        return self[bisect_left(self.__times, start):bisect_right(self.__times, end)]
+
+    def mark_restored(self, path: str) -> bool:
+        """Marks the earliest entry of the file at the path that is not marked yet as restored
+        and returns whether or not there was one, which there is not for a file the Virus never deleted
+
+        :param path: The full path of the file when it was deleted
+        """
+        for index in self.__by_path.get(path, ()):
+            if index not in self.__restored:
+                self.__restored.add(index)
+                return True
+        return False
+
+    def get_restored(self) -> List[int]:
+        """Returns the indexes of the entries whose file has been restored, in order"""
+        return sorted(self.__restored)
+
+    def set_restored(self, indexes: Iterable[int]):
+        """Sets the indexes of the entries whose file has been restored, as they were saved
+
+        :param indexes: The indexes of the entries, of which those past the end of the log are ignored
+        """
+        self.__restored = {index for index in indexes if index < len(self)}
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def _append(self, virus_id: int, path: str, location: str, logged: float):
+        """Adds an entry to the end of the log, which is only done by the Save holding the log"""
+        index = len(self.__virus_ids)
+        self.__virus_ids.append(virus_id)
+        self.__paths.append(path)
+        self.__locations.append(location)
+        self.__times.append(logged)
+        self.__by_path.setdefault(path, []).append(index)
+
+    def take(self) -> dict:
+        """Returns the record of the entries that are not in the log file yet, which are about
+        to be written into it, and which are not counted as being in it until the record is committed
+        """
+        start = self.__persisted
+        return {
+            "start": start,
+            "virus_ids": self.__virus_ids[start:].tolist(),
+            "paths": self.__paths[start:],
+            "locations": self.__locations[start:],
+            "times": self.__times[start:].tolist()}
+
+    def commit(self, record: dict):
+        """Counts the entries of a record taken from the log as being in the log file once it was written
+
+        :param record: The record that was written
+        """
+        self.__persisted = record["start"] + len(record["virus_ids"])
+
+    @staticmethod
+    def append(file: str, record: dict):
+        """Writes a record taken from a log into the log file and waits until it is on disk
+
+        A record of the whole log replaces the log file instead of being appended to it
+
+        :param file: The path of the log file
+        :param record: The record to write
+        """
+        if not record["virus_ids"]:
+            return
+        if record["start"] == 0:
+            Hexable.save(record, file)
+            return
+        Hexable.append(record, file)
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    @staticmethod
+    def load(file: str, length: int) -> 'DeletionLog':
+        """Loads the first entries of the log file, up to the length that the game save holds
+
+        :param file: The path of the log file
+        :param length: The amount of entries in the log when the game save was saved
+        """
+        log = DeletionLog()
+        if length == 0 or not os.path.exists(file):
+            return log
+
+        virus_ids = array("L")
+        columns = ([], [], array("d"))
+        with Hexable.map(file) as log_file:
+            offset = 0
+            while offset < len(log_file):
+                try:
+                    record, offset = Hexable.read_buffer(log_file, offset)
+                except ValueError:
+                    break
+                if record["start"] > len(virus_ids):
+                    break
+                del virus_ids[record["start"]:]
+                virus_ids.extend(record["virus_ids"])
+                for column, values in zip(columns, (record["paths"], record["locations"], record["times"])):
+                    del column[record["start"]:]
+                    column.extend(values)
+        log.__extend(zip(virus_ids[:length], *(column[:length] for column in columns)))
+        return log
+
+    @staticmethod
+    def from_entries(entries: Iterable[Tuple[int, str, str]]) -> 'DeletionLog':
+        """Creates a log from (virus id, path, location) entries, as they were held in older game saves,
+        none of which are in a log file yet
+
+        :param entries: The entries of the log
+        """
+        log = DeletionLog()
+        for virus_id, path, location in entries:
+            log._append(virus_id, path, location, 0.0)
+        return log
+
+    def __extend(self, entries: Iterable[Tuple[int, str, str, float]]):
+        """Adds entries that were read from the log file"""
+        for entry in entries:
+            self._append(*entry)
+        self.__persisted = len(self)
@@ -1,7 +1,9 @@
-from random import choice, randint
-from typing import Tuple, Union
+import os
+from concurrent.futures import ProcessPoolExecutor
+from random import Random, getrandbits
+from typing import List, Optional, Tuple, Union
 
-from model import Directory, NormalFile, VirusFile
+from model import Directory, FilesystemTable, NormalFile, VirusFile
 
 valid_chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890_-"
 valid_exts = [".py", ".sh", ".png", ".jpeg", ".jpg", ".ico", ".c", ".dat", ".db",
@@ -11,129 +13,318 @@ valid_exts = [".py", ".sh", ".png", ".jpeg", ".jpg", ".ico", ".c", ".dat", ".db"
               ".xar", ".yaml", ".yml"]
 valid_virus_exts = [".py", ".sh", ".c", ".jar", ".js", ".lisp"]
 
+# The lengths that names are generated with, not counting the extension, and the sizes that files are generated with
+name_lengths = range(5, 21)
+file_sizes = range(NormalFile.MINIMUM_SIZE, NormalFile.MAXIMUM_SIZE + 1)
 
-def choose_random_directory(root_directory: Directory) -> Directory:
+# The backends that a generated filesystem can be held in
+OBJECT_BACKEND = "object"
+TABLE_BACKEND = "table"
+
+# The policies that random files and directories can be chosen with
+#   LEGACY_SAMPLING walks down the tree with a 90% chance of moving into a random sub-directory at each level
+#   UNIFORM_SAMPLING makes every file, or directory, equally likely to be chosen
+#   DEPTH_WEIGHTED_SAMPLING makes the files of a directory, and each sub-directory, equally likely at each level
+LEGACY_SAMPLING = "legacy"
+UNIFORM_SAMPLING = "uniform"
+DEPTH_WEIGHTED_SAMPLING = "depth"
+
+# The amount of top-level directories from which a new filesystem is generated
+#   across worker processes when the amount of workers is not given
+PARALLEL_DIRECTORIES = 40
+
+# The random number generator used when no seeded generator is given
+__random = Random()
+
+
+def choose_random_directory(root_directory: Directory, rng: Random = None,
+                            policy: str = LEGACY_SAMPLING) -> Directory:
     """Returns a random directory from whatever depth starting off at the
     specified root directory
+
+    :param root_directory: The directory to start choosing from
+    :param rng: The random number generator to use
+    :param policy: The policy to choose the directory with
     """
+    rng = rng or __random
+    directory = root_directory
 
-    # Choose a sub-directory
-    chosen_dir = None
-    if randint(1, 100) % 10 != 0:  # This results in an 90% chance that a directory is chosen
-        found_dir = False
-        for entry in root_directory.get_entries():
-            if isinstance(entry, Directory):
-                found_dir = True
-                break
-        if not found_dir:
-            return root_directory
-        target = choice(root_directory.get_entries())
-        while not isinstance(target, Directory):
-            target = choice(root_directory.get_entries())
-        chosen_dir = choose_random_directory(target)
+    # Find the directory at a random index of every directory in the subtree
+    if policy == UNIFORM_SAMPLING:
+        index = rng.randrange(root_directory.get_directory_count() + 1)
+        while index > 0:
+            index -= 1
+            for subdirectory in directory.get_directories():
+                count = subdirectory.get_directory_count() + 1
+                if index < count:
+                    directory = subdirectory
+                    break
+                index -= count
+        return directory
 
-    # Choose the given directory if none was found or sub-directory was not wanted
-    if chosen_dir is None:
-        chosen_dir = root_directory
-    return chosen_dir
+    while directory.get_directories():
+        subdirectories = directory.get_directories()
+        if policy == DEPTH_WEIGHTED_SAMPLING:
+            choice = rng.randrange(len(subdirectories) + 1)
+            if choice == len(subdirectories):
+                break
+            directory = subdirectories[choice]
+        elif rng.randint(1, 100) % 10 != 0:  # This results in an 90% chance that a directory is chosen
+            directory = rng.choice(subdirectories)
+        else:
+            break
+    return directory
 
 
-def choose_random_file(root_directory: Directory) -> NormalFile:
+def choose_random_file(root_directory: Directory, rng: Random = None,
+                       policy: str = LEGACY_SAMPLING) -> Optional[NormalFile]:
     """Returns a random file from whatever depth starting off at the
-    specified root directory
+    specified root directory, or None if there are no files left below it
+
+    Sub-directories with no files left below them are never walked into
+    so a file is always found in a bounded amount of steps
+
+    :param root_directory: The directory to start choosing from
+    :param rng: The random number generator to use
+    :param policy: The policy to choose the file with
     """
+    rng = rng or __random
+    if root_directory.get_normal_file_count() == 0:
+        return None
+    directory = root_directory
+
+    # Find the file at a random index of every file in the subtree
+    if policy == UNIFORM_SAMPLING:
+        index = rng.randrange(root_directory.get_normal_file_count())
+        while True:
+            files = directory.get_files()
+            if index < len(files):
+                return files[index]
+            index -= len(files)
+            for subdirectory in directory.get_directories():
+                count = subdirectory.get_normal_file_count()
+                if index < count:
+                    directory = subdirectory
+                    break
+                index -= count
 
-    # Choose a sub-directory
-    chosen_dir = choose_random_directory(root_directory)
     while True:
-        found_file = False
-        for entry in chosen_dir.get_entries():
-            if not isinstance(entry, VirusFile) and not isinstance(entry, Directory):
-                found_file = True
-                break
-        if found_file:
-            break
-        chosen_dir = choose_random_directory(chosen_dir)
-    target = choice(chosen_dir.get_entries())
-    while not isinstance(target, NormalFile) or isinstance(target, VirusFile):
-        target = choice(chosen_dir.get_entries())
-    return target
+        files = directory.get_files()
+        subdirectories = [subdirectory for subdirectory in directory.get_directories()
+                          if subdirectory.get_normal_file_count() > 0]
+        if not subdirectories:
+            return rng.choice(files)
+        if policy == DEPTH_WEIGHTED_SAMPLING:
+            choice = rng.randrange(len(subdirectories) + (1 if files else 0))
+            if choice == len(subdirectories):
+                return rng.choice(files)
+            directory = subdirectories[choice]
+        elif not files or rng.randint(1, 100) % 10 != 0:  # This results in an 90% chance that a directory is chosen
+            directory = rng.choice(subdirectories)
+        else:
+            return rng.choice(files)
 
 
-def generate_filename(is_virus: bool = False) -> str:
+def generate_filename(is_virus: bool = False, rng: Random = None) -> str:
     """Returns a randomly generated filename with a random extension"""
-    if is_virus:
-        return "".join([choice(valid_chars) for _ in range(randint(5, 20))]) + choice(valid_virus_exts)
-    return "".join([choice(valid_chars) for _ in range(randint(5, 20))]) + choice(valid_exts)
+    rng = rng or __random
+    name = "".join(rng.choices(valid_chars, k=rng.choice(name_lengths)))
+    return name + rng.choice(valid_virus_exts if is_virus else valid_exts)
 
 
-def generate_filesystem(username: str) -> Tuple[Directory, int, dict]:
+def generate_filesystem(username: str, seed: int = None, directories: int = 10,
+                        backend: str = OBJECT_BACKEND, workers: int = None) -> Tuple[Directory, int, dict]:
     """Generates the filesystem to be used for a new game and
     returns the root of the system
+
+    :param username: The username of the game save which names the user directory
+    :param seed: The seed to generate the filesystem from. The same seed always
+        generates the same filesystem
+    :param directories: The amount of top-level directories to generate inside the user directory
+    :param backend: OBJECT_BACKEND to create every Entry of the filesystem up front or
+        TABLE_BACKEND to keep the filesystem in a FilesystemTable and only create
+        the Entries of a Directory once it is used
+    :param workers: The amount of worker processes to generate the top-level directories in
+    """
+    table, file_count, virus_files = generate_table(username, seed, directories, workers)
+    if backend == TABLE_BACKEND:
+        return table.get_view(), file_count, virus_files
+    return table.to_directory(), file_count, virus_files
+
+
+def generate_table(username: str, seed: int = None, directories: int = 10,
+                   workers: int = None) -> Tuple[FilesystemTable, int, dict]:
+    """Generates the filesystem to be used for a new game into a FilesystemTable
+    and returns the table, the amount of normal files and the virus file locations
+
+    Each top-level directory is generated from a seed of its own, drawn in order from the seed
+    of the filesystem, so the same seed generates the same filesystem no matter how many workers are used
+
+    :param username: The username of the game save which names the user directory
+    :param seed: The seed to generate the filesystem from
+    :param directories: The amount of top-level directories to generate inside the user directory
+    :param workers: The amount of worker processes to generate the top-level directories in,
+        which defaults to every CPU once there are at least PARALLEL_DIRECTORIES of them
+        and to generating them in this process otherwise
     """
-    root = Directory("root")
-    usr = Directory("usr", parent=root)
-    user_dir = Directory(username, parent=usr)
-    root.add_entry(usr)
-    usr.add_entry(user_dir)
+    if seed is None:
+        seed = getrandbits(64)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if directories >= PARALLEL_DIRECTORIES else 1
+    rng = Random(seed)
 
+    table = FilesystemTable()
+    root = table.add_directory("root")
+    usr = table.add_directory("usr", root)
+    user_dir = table.add_directory(username, usr)
+    path = table.get_path(user_dir)
+
+    subtrees = []
+    used_names = set()
+    for subdir in range(directories):
+        subtrees.append((path, generate_directory_name(used_names, rng), rng.getrandbits(64), seed))
+
+    # A pool only pays for itself when there are at least two top-level directories to split between workers
     file_count = 0
-    for subdir in range(10):
-        tmpdir, amt_files = generate_directory(user_dir)
-        user_dir.add_entry(tmpdir)
-        file_count += amt_files
-    virus_files = generate_virus(user_dir, n=file_count // 1000)
-    return root, file_count, virus_files
+    if workers > 1 and directories > 1:
+        with ProcessPoolExecutor(min(workers, directories)) as executor:
+            subtables = list(executor.map(generate_subtree, subtrees))
+    else:
+        subtables = map(generate_subtree, subtrees)
+    for subtable in subtables:
+        file_count += subtable.get_aggregates(0)[1]
+        table.add_table(subtable, user_dir)
+
+    # Randomly place the virus files throughout the system
+    virus_files = {}
+    for virus in range(file_count // 1000):
+        target = table.choose_random_directory(user_dir, rng)
+        filename = generate_filename(True, rng)
+        while table.get_child(target, filename) is not None:
+            filename = generate_filename(True, rng)
+        table.add_file(filename, target, rng.randint(NormalFile.MINIMUM_SIZE, NormalFile.MAXIMUM_SIZE),
+                       NormalFile.derive_seed(seed, f"{table.get_path(target)}/{filename}"), number=virus + 1)
+        virus_files[str(virus + 1)] = table.get_path(table.get_parent(target))
+    return table, file_count, virus_files
+
 
+def generate_subtree(subtree: Tuple[str, str, int, int]) -> FilesystemTable:
+    """Generates a top-level directory, and everything below it, into a FilesystemTable of its own
+    which is small enough to be sent back from a worker process
 
-def generate_virus(root_directory: Directory, virus_id: int = -1, n: int = 1) -> Union[str, dict]:
+    :param subtree: The path of the parent Directory, the name of the Directory,
+        the seed to generate the Directory from, and the seed of the game
+    """
+    parent_path, name, subtree_seed, seed = subtree
+    table = FilesystemTable()
+    generate_directory(table, -1, set(), seed=seed, rng=Random(subtree_seed), name=name, parent_path=parent_path)
+    return table
+
+
+def generate_virus(root_directory: Directory, virus_id: int = -1, n: int = 1,
+                   seed: int = None, rng: Random = None) -> Union[str, dict]:
     """Randomly places virus files throughout the system
     starting at the directory specified
 
     :param root_directory: The directory to start placing the virus files at
     :param virus_id: The number of the virus file to
     :param n: The amount of virus files to place
+    :param seed: The seed of the game that the seeds of the virus files are derived from
+    :param rng: The random number generator to use
     """
-    filename = generate_filename(True)
+    rng = rng or __random
     if virus_id != -1:
-        virus_file = VirusFile(virus_id, filename, root_directory)
+        filename = generate_filename(True, rng)
+        file_seed = NormalFile.derive_seed(0 if seed is None else seed, f"{root_directory}/{filename}")
+        virus_file = VirusFile(virus_id, filename, root_directory,
+                               size=rng.randint(NormalFile.MINIMUM_SIZE, NormalFile.MAXIMUM_SIZE), seed=file_seed)
         root_directory.add_entry(virus_file)
         virus_file_2nd_parent = "/".join(str(virus_file).split("/")[:-2])
         return virus_file_2nd_parent
 
     virus_files = {}
     for virus in range(n):
-        target = choose_random_directory(root_directory)
-        virus_files[str(virus + 1)] = generate_virus(target, virus + 1)
+        target = choose_random_directory(root_directory, rng)
+        virus_files[str(virus + 1)] = generate_virus(target, virus + 1, seed=seed, rng=rng)
     return virus_files
 
 
-def generate_directory(parent: Directory, depth: int = 0) -> Tuple[Directory, int]:
+def generate_directory_name(used_names: set, rng: Random = None) -> str:
+    """Returns a randomly generated Directory name that is not one of the used names and adds it to them
+
+    :param used_names: The names already used inside the parent Directory
+    :param rng: The random number generator to use
+    """
+    return generate_names(1, used_names, rng=rng)[0]
+
+
+def generate_names(count: int, used_names: set, extensions: List[str] = None, rng: Random = None) -> List[str]:
+    """Returns the amount of randomly generated names that are not one of the used names,
+    and adds them to the used names
+
+    Every character, length, and extension of the names is drawn in a single call each
+    which gives the same distributions as drawing every name on its own
+
+    :param count: The amount of names to generate
+    :param used_names: The names already used inside the parent Directory
+    :param extensions: The extensions to choose from, or None to generate names without an extension
+    :param rng: The random number generator to use
+    """
+    rng = rng or __random
+    lengths = rng.choices(name_lengths, k=count)
+    chars = "".join(rng.choices(valid_chars, k=sum(lengths)))
+    exts = rng.choices(extensions, k=count) if extensions else [""] * count
+
+    names = []
+    start = 0
+    for length, ext in zip(lengths, exts):
+        name = chars[start:start + length] + ext
+        start += length
+        while name in used_names:
+            name = "".join(rng.choices(valid_chars, k=rng.choice(name_lengths))) + ext
+        used_names.add(name)
+        names.append(name)
+    return names
+
+
+def generate_directory(table: FilesystemTable, parent: int, used_names: set, depth: int = 0,
+                       seed: int = None, rng: Random = None, name: str = None, parent_path: str = None) -> int:
     """Recursively generates a Directory with a maximum depth of 4 Directories deep
+    into the table and returns the amount of files generated
 
-    :param parent: The parent Directory that the generated Directory will belong to
+    :param table: The FilesystemTable to generate the Directory into
+    :param parent: The node of the parent Directory that the generated Directory will belong to
+    :param used_names: The names already used inside the parent Directory
     :param depth: The current directory depth to control the maximum depth
+    :param seed: The seed of the game that the seeds of the files are derived from
+    :param rng: The random number generator to use
+    :param name: The name of the Directory, which is randomly generated if it is not given
+    :param parent_path: The path of the parent Directory, which is only needed when the
+        parent Directory is not in the table
     """
+    rng = rng or __random
+    if seed is None:
+        seed = rng.getrandbits(64)
 
     total_files = 0
-    dir_name = "".join([choice(valid_chars) for _ in range(randint(5, 20))])
-    directory = Directory(dir_name, parent=parent)
-
-    # Generate a random amount of child Directories
-    for i in range(randint(2, 5)):
-        if depth < 4:
-            tmpdir, amt_files = generate_directory(directory, depth + 1)
-            total_files += amt_files
-            directory.add_entry(tmpdir)
-
-    # Generate a random amount of files
-    used_filenames = []
-    for i in range(randint(2, 20)):
+    dir_name = name if name is not None else generate_directory_name(used_names, rng)
+    directory = table.add_directory(dir_name, parent)
+    path = f"{parent_path}/{dir_name}" if parent_path is not None else table.get_path(directory)
+
+    # Draw the names of a random amount of child Directories and files, and the sizes of the files, all at once
+    child_names = set()
+    directory_count = rng.randint(2, 5) if depth < 4 else 0
+    file_count = rng.randint(2, 20)
+    directory_names = generate_names(directory_count, child_names, rng=rng)
+    filenames = generate_names(file_count, child_names, valid_exts, rng)
+    sizes = rng.choices(file_sizes, k=file_count)
+
+    for child_name in directory_names:
+        total_files += generate_directory(table, directory, child_names, depth + 1, seed, rng,
+                                          name=child_name, parent_path=path)
+
+    for filename, size in zip(filenames, sizes):
         total_files += 1
-        filename = generate_filename()
-        while filename in used_filenames:
-            filename = generate_filename()
-        used_filenames.append(filename)
-        directory.add_entry(NormalFile(filename, directory))
+        table.add_file(filename, directory, size, NormalFile.derive_seed(seed, f"{path}/{filename}"))
 
-    return directory, total_files
+    return total_files
@@ -0,0 +1,231 @@
+import os
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Callable, Dict, List
+
+from model import Directory, Entry, NormalFile, StoreDirectory, VirusFile
+from model.util import Hexable
+
+
+class FilesystemStore:
+    """A FilesystemStore reads the filesystem of a game save from disk one Directory at a time
+    so that loading a game only reads the Directories that are actually used
+
+    The file holds a Hexable record for every Directory, followed by the offset of each record
+    as an array of unsigned 64-bit integers, an index record, and a fixed-size trailer:
+        directory records | record offsets | index record | index offset (8 bytes) | magic (4 bytes)
+
+    A Directory record holds the JSON objects of its files and, for each of its Directories,
+    the name, record number and aggregates so a Directory knows its size and counts before it is read,
+    followed by the original parent of the Directory if it was moved into the Trash.
+    The index record holds the generation of the snapshot and the records of the root and the Trash.
+
+    The file is kept mapped into memory until the store is closed, so records are decoded straight from the mapped file.
+    Since a mapped file cannot be replaced on every platform, a new snapshot is only saved over it through replace.
+
+    :param file: The path of the file to read
+    :raises FileNotFoundError: When the file does not exist
+    :raises ValueError: When the file is not a valid filesystem store
+    """
+
+    MAGIC = b"VSFS"
+    TRAILER = struct.Struct(">Q4s")
+    OFFSET = struct.Struct(">Q")
+
+    def __init__(self, file: str):
+        self.__views: List[StoreDirectory] = []
+        self.__open(file)
+
+    def __open(self, file: str):
+        """Maps the file of the store and reads its index"""
+        self.__buffer = Hexable.map(file)
+        if len(self.__buffer) < FilesystemStore.TRAILER.size:
+            raise ValueError(f"File, {file} is not a filesystem store")
+        index_offset, magic = FilesystemStore.TRAILER.unpack_from(
+            self.__buffer, len(self.__buffer) - FilesystemStore.TRAILER.size)
+        if magic != FilesystemStore.MAGIC:
+            raise ValueError(f"File, {file} is not a filesystem store")
+        self.__index = Hexable.read_buffer(self.__buffer, index_offset)[0]
+
+    def close(self):
+        """Unmaps the file of the store, after which the StoreDirectories it created can no longer be read"""
+        self.__buffer.close()
+
+    def replace(self, temp_file: str, file: str, records: Dict[int, int]):
+        """Renames a new snapshot of the same filesystem over the file of the store and reads from it instead
+
+        The StoreDirectories created by this store that have not been read yet are pointed at their records
+        in the new snapshot, and those without a record in it are read from the old snapshot first.
+        If the new snapshot cannot be renamed, the store keeps reading from the old one.
+
+        :param temp_file: The path of the new snapshot
+        :param file: The path of the file of the store
+        :param records: The record in the new snapshot of each record of this store that it holds
+        """
+        for view in self.__views:
+            if not view.is_materialized() and view._get_record() not in records:
+                view.get_entries()
+        self.__views = [view for view in self.__views if not view.is_materialized()]
+
+        self.close()
+        try:
+            os.replace(temp_file, file)
+        finally:
+            self.__open(file)
+        for view in self.__views:
+            view._set_record(records[view._get_record()])
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def get_generation(self) -> int:
+        """Returns the generation of the snapshot held in the store"""
+        return self.__index["generation"]
+
+    def get_root(self) -> StoreDirectory:
+        """Returns a StoreDirectory view over the root of the filesystem"""
+        return self.__create_directory(self.__index["root"])
+
+    def get_trash(self) -> StoreDirectory:
+        """Returns a StoreDirectory view over the Trash"""
+        return self.__create_directory(self.__index["trash"])
+
+    def read(self, record: int) -> dict:
+        """Reads the record of a Directory
+
+        :param record: The number of the record
+        """
+        offset, = FilesystemStore.OFFSET.unpack_from(
+            self.__buffer, self.__index["offsets"] + record * FilesystemStore.OFFSET.size)
+        return Hexable.read_buffer(self.__buffer, offset)[0]
+
+    def create_entries(self, record: int, parent: Directory) -> List[Entry]:
+        """Creates the Entry objects inside of the Directory in the record
+
+        :param record: The number of the record of the Directory
+        :param parent: The Directory object that the Entries belong to
+        """
+        json = self.read(record)
+        entries = []
+        for name, child, *aggregates in json["directories"]:
+            directory = StoreDirectory(self, child, name, tuple(aggregates[:4]), parent)
+            if len(aggregates) > 4:
+                directory.set_original_parent(aggregates[4])
+            self.__views.append(directory)
+            entries.append(directory)
+        for file in json["files"]:
+            entry = VirusFile.from_json(file) if file["type"] == "VirusFile" else NormalFile.from_json(file)
+            entry.set_parent(parent)
+            entries.append(entry)
+        return entries
+
+    def to_json(self, record: int, records: Dict[int, int] = None) -> dict:
+        """Returns the same JSON object that Directory.to_json returns for the Directory in the record
+        without creating an object for any of its Entries
+
+        :param record: The number of the record of the Directory
+        :param records: Filled with the record of the Directory and of every Directory below it,
+            keyed by the id of their JSON objects, if it is given
+        """
+        json = self.read(record)
+        entries = json["files"]
+        for _, child, *aggregates in json["directories"]:
+            entries.append(self.to_json(child, records))
+            if len(aggregates) > 4:
+                entries[-1]["parent"] = aggregates[4]
+        json = {
+            "type": "Directory",
+            "name": json["name"],
+            "entries": sorted(entries, key=lambda entry: entry["name"])}
+        if records is not None:
+            records[id(json)] = record
+        return json
+
+    def __create_directory(self, reference: list) -> StoreDirectory:
+        """Creates the StoreDirectory for a [name, record, *aggregates] reference"""
+        name, record, *aggregates = reference
+        directory = StoreDirectory(self, record, name, tuple(aggregates[:4]))
+        self.__views.append(directory)
+        return directory
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    @staticmethod
+    def save(file: str, root: dict, trash: dict, generation: int,
+             replace: Callable[[str, str, Dict[int, int]], None] = None):
+        """Saves the JSON objects of the root and Trash Directories into a new filesystem store
+
+        :param file: The path of the file to save into
+        :param root: The JSON object of the root Directory
+        :param trash: The JSON object of the Trash Directory
+        :param generation: The generation of the snapshot
+        :param replace: The function that renames the new store, its first argument, over the file,
+            which is also given the records written by write
+        """
+        records = {}
+
+        def write(stream: BinaryIO):
+            records.update(FilesystemStore.write(stream, root, trash, generation))
+
+        if replace is None:
+            Hexable.save_atomically(file, write)
+        else:
+            Hexable.save_atomically(file, write, lambda temp_file, target: replace(temp_file, target, records))
+
+    @staticmethod
+    def write(stream: BinaryIO, root: dict, trash: dict, generation: int) -> Dict[int, int]:
+        """Writes the JSON objects of the root and Trash Directories into a binary stream as a filesystem store
+        and returns the record of every Directory, keyed by the id of its JSON object
+
+        :param stream: The binary stream to write into
+        :param root: The JSON object of the root Directory
+        :param trash: The JSON object of the Trash Directory
+        :param generation: The generation of the snapshot
+        """
+        offsets = array("Q")
+        records = {}
+        index = {
+            "generation": generation,
+            "root": FilesystemStore.__write_directory(stream, root, offsets, records),
+            "trash": FilesystemStore.__write_directory(stream, trash, offsets, records),
+            "offsets": stream.tell()}
+        if sys.byteorder != "big":
+            offsets.byteswap()
+        stream.write(offsets.tobytes())
+        index_offset = stream.tell()
+        Hexable.write(index, stream)
+        stream.write(FilesystemStore.TRAILER.pack(index_offset, FilesystemStore.MAGIC))
+        return records
+
+    @staticmethod
+    def __write_directory(stream: BinaryIO, json: dict, offsets: array, records: Dict[int, int]) -> list:
+        """Writes the records of the Directory and everything below it, children first,
+        and returns the [name, record, *aggregates] reference to the Directory
+        """
+        files = []
+        directories = []
+        size = normal_files = virus_files = directory_count = 0
+        for entry in json.get("entries", []):
+            if entry["type"] == "Directory":
+                reference = FilesystemStore.__write_directory(stream, entry, offsets, records)
+                directories.append(reference)
+                size += reference[2]
+                normal_files += reference[3]
+                virus_files += reference[4]
+                directory_count += reference[5] + 1
+            else:
+                files.append(entry)
+                size += entry.get("size") or 0
+                if entry["type"] == "VirusFile":
+                    virus_files += 1
+                else:
+                    normal_files += 1
+
+        record = len(offsets)
+        records[id(json)] = record
+        offsets.append(stream.tell())
+        Hexable.write({"name": json["name"], "files": files, "directories": directories}, stream)
+        reference = [json["name"], record, size, normal_files, virus_files, directory_count]
+        if "parent" in json:
+            reference.append(json["parent"])
+        return reference
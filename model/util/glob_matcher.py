@@ -0,0 +1,160 @@
+import re
+from collections import OrderedDict
+from fnmatch import translate
+from threading import Lock
+from typing import Callable, List, Optional, Tuple
+
+from model import Directory, Entry
+
+
+class GlobMatcher:
+    """The GlobMatcher expands shell-style patterns into the Entries they match in a Directory tree,
+    where "*" matches any part of a name, "?" matches a single character, "[...]" matches a single
+    character in the brackets, and a "**" part matches every Directory below, at any depth
+
+    Each part of a pattern only ever looks through the Directories matched by the part before it,
+    and the compiled parts of the most recently used patterns are cached since players repeat
+    the same patterns over and over while looking for the virus files.
+    """
+
+    CACHE_SIZE = 256
+    MAGIC = "*?["
+
+    __instance = None
+
+    @staticmethod
+    def get_instance() -> 'GlobMatcher':
+        if GlobMatcher.__instance is None:
+            GlobMatcher.__instance = GlobMatcher()
+        return GlobMatcher.__instance
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.__cache_size = cache_size
+        self.__cache: OrderedDict[str, Callable[[str], Optional[re.Match]]] = OrderedDict()
+        self.__lock = Lock()
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    @staticmethod
+    def has_magic(pattern: str) -> bool:
+        """Returns whether or not the pattern has any wildcards in it
+
+        :param pattern: The pattern to check
+        """
+        return any(char in pattern for char in GlobMatcher.MAGIC)
+
+    def compile(self, part: str) -> Callable[[str], Optional[re.Match]]:
+        """Returns a function that matches a whole name against a single part of a pattern
+
+        :param part: The part of the pattern, which has no "/" in it
+        """
+        with self.__lock:
+            matcher = self.__cache.get(part)
+            if matcher is not None:
+                self.__cache.move_to_end(part)
+                return matcher
+
+        matcher = re.compile(translate(part)).match
+        with self.__lock:
+            self.__cache[part] = matcher
+            if len(self.__cache) > self.__cache_size:
+                self.__cache.popitem(last=False)
+        return matcher
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def expand(self, directory: Directory, pattern: str, show_hidden: bool = False,
+               prune: Callable[[Directory], bool] = None) -> List[Tuple[str, Entry]]:
+        """Returns the path and the Entry of everything the "/"-separated pattern matches,
+        in the order they are found with the Entries of each Directory sorted by name
+
+        The pattern is relative to the Directory, or absolute when it starts with the name of the root,
+        the same way Directory.resolve finds a path. A pattern without any wildcards is resolved as a path.
+        Wildcards only match the Entries below a Directory, never the Directory itself or any Directory
+        above it, which can only be reached with a literal "..".
+
+        :param directory: The Directory the pattern is relative to
+        :param pattern: The pattern to expand
+        :param show_hidden: Whether or not wildcards match hidden Entries when the part of the pattern
+            does not start with a "." itself
+        :param prune: A function that returns True for the Directories that nothing should be matched below,
+            which is checked against every Directory that is looked through
+        """
+        if not GlobMatcher.has_magic(pattern):
+            entry = directory.resolve(pattern)
+            return [(pattern, entry)] if entry is not None else []
+
+        parts = pattern.split("/")
+        matches: List[Tuple[str, Entry]] = [("", directory)]
+        for index, part in enumerate(parts):
+            last = index == len(parts) - 1
+            found: List[Tuple[str, Entry]] = []
+            if part in ["", "."]:
+                found = [(f"{path}{part}/" if part else path, entry)
+                         for path, entry in matches if isinstance(entry, Directory)]
+            elif part == "..":
+                found = [(f"{path}../", entry.get_parent() or entry)
+                         for path, entry in matches if isinstance(entry, Directory)]
+            elif part == "**":
+                for path, entry in matches:
+                    if isinstance(entry, Directory):
+                        found.extend(self.__walk(path, entry, show_hidden, prune, last))
+            elif not GlobMatcher.has_magic(part):
+                for path, entry in matches:
+                    if not isinstance(entry, Directory):
+                        continue
+                    child = entry.get_entry(part)
+                    if child is None and index == 0 and directory.get_root().get_name() == part:
+                        child = directory.get_root()
+                    if child is not None:
+                        found.append((f"{path}{part}", child))
+            else:
+                matcher = self.compile(part)
+                hidden = show_hidden or part.startswith(".")
+                for path, entry in matches:
+                    if not isinstance(entry, Directory):
+                        continue
+                    for child in entry.get_entries():
+                        if (matcher(child.get_name()) and (hidden or not child.is_hidden()) and
+                                (last or isinstance(child, Directory))):
+                            found.append((f"{path}{child.get_name()}", child))
+
+            # Every Entry that is not the end of the pattern is a Directory to look through next
+            matches = []
+            seen = set()
+            for path, entry in found:
+                if id(entry) in seen:
+                    continue
+                if not last and not isinstance(entry, Directory):
+                    continue
+                if not last and prune is not None and prune(entry):
+                    continue
+                seen.add(id(entry))
+                matches.append((path if last or not path or path.endswith("/") else f"{path}/", entry))
+        return [(path.rstrip("/") or ".", entry) for path, entry in matches]
+
+    @staticmethod
+    def __walk(path: str, directory: Directory, show_hidden: bool,
+               prune: Optional[Callable[[Directory], bool]], last: bool) -> List[Tuple[str, Entry]]:
+        """Returns the Directory and every Directory below it, or every Entry below it
+        if the "**" is the last part of the pattern, skipping the Directories that are pruned
+        """
+        found = []
+        stack = [(path, directory)]
+        while stack:
+            path, directory = stack.pop()
+            if not last:
+                found.append((path, directory))
+            children = []
+            for child in directory.get_entries():
+                if not show_hidden and child.is_hidden():
+                    continue
+                child_path = f"{path}{child.get_name()}"
+                if isinstance(child, Directory):
+                    if prune is not None and prune(child):
+                        continue
+                    children.append((f"{child_path}/", child))
+                if last:
+                    found.append((child_path, child))
+            stack.extend(reversed(children))
+        return found
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Iterable, Iterator, Tuple, Union
+
+from model import NormalFile
+
+
+class HexDump:
+    """The HexDump renders the bytes of files the way the cat command shows them,
+    as space-separated hex bytes with 16 bytes to a line
+
+    The most recently rendered files are cached since players cat the same files
+    over and over while looking for the virus files.
+    """
+
+    BYTES_PER_LINE = 16
+    CACHE_SIZE = 1024
+    CHUNK_SIZE = 64 * 1024
+
+    __instance = None
+
+    @staticmethod
+    def get_instance() -> 'HexDump':
+        if HexDump.__instance is None:
+            HexDump.__instance = HexDump()
+        return HexDump.__instance
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.__cache_size = cache_size
+
+        # The rendered files, by the identity of the file, along with the file itself
+        #   which keeps the identity from being reused by another file while it is cached
+        self.__cache: OrderedDict[int, Tuple[NormalFile, str]] = OrderedDict()
+        self.__lock = Lock()
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    @staticmethod
+    def format(data: bytes) -> str:
+        """Returns the bytes as space-separated hex bytes, each followed by a space,
+        with a line break after every 16 bytes
+
+        :param data: The bytes to format
+        """
+        lines = [f"{data[index:index + HexDump.BYTES_PER_LINE].hex(' ')} "
+                 for index in range(0, len(data), HexDump.BYTES_PER_LINE)]
+        if len(data) % HexDump.BYTES_PER_LINE == 0 and data:
+            lines.append("")
+        return "\n".join(lines)
+
+    def render(self, file: NormalFile) -> str:
+        """Returns the hex dump of the bytes of the file
+
+        :param file: The file to render
+        """
+        with self.__lock:
+            cached = self.__cache.get(id(file))
+            if cached is not None:
+                self.__cache.move_to_end(id(file))
+                return cached[1]
+
+        dump = HexDump.format(file.get_bytes())
+        with self.__lock:
+            self.__cache[id(file)] = (file, dump)
+            if len(self.__cache) > self.__cache_size:
+                self.__cache.popitem(last=False)
+        return dump
+
+    def stream(self, outputs: Iterable[Union[str, NormalFile]]) -> Iterator[str]:
+        """Renders the files, or messages, one after another on separate lines
+        and yields the output in chunks of around CHUNK_SIZE characters
+
+        :param outputs: The files to render and the messages to show in between them
+        """
+        chunk = []
+        size = 0
+        for index, output in enumerate(outputs):
+            if index > 0:
+                chunk.append("\n")
+            chunk.append(output if isinstance(output, str) else self.render(output))
+            size += len(chunk[-1])
+            if size >= HexDump.CHUNK_SIZE:
+                yield "".join(chunk)
+                chunk = []
+                size = 0
+        if chunk:
+            yield "".join(chunk)
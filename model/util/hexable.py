@@ -1,36 +1,208 @@
+import io
+import mmap
 import os
+import struct
+import tempfile
+import zlib
 from json import dumps, loads
+from typing import BinaryIO, Callable, Tuple, Union
 
 
 class Hexable:
+    """Hexable reads and writes the JSON objects used by the game's save files
+
+    Files are written in a versioned binary format made up of a fixed header
+    followed by the (optionally zlib-compressed) UTF-8 encoded JSON payload:
+        magic (4 bytes) | version (1 byte) | flags (1 byte) | length (8 bytes) | crc32 (4 bytes) | payload
+
+    Files are loaded through a memory map so each record is checked and decompressed
+    straight from the mapped file instead of from copies of it read into memory.
+
+    Files written in the legacy format, where every JSON character was written
+    as a separate hex token, are still read and are migrated on their first load.
+    """
+
+    MAGIC = b"VSHX"
+    VERSION = 1
+    FLAG_COMPRESSED = 0x01
+    HEADER = struct.Struct(">4sBBQI")
+    BUFFER_SIZE = 64 * 1024
+    COMPRESSION_LEVEL = 6
 
     @staticmethod
-    def save(json: dict, file: str):
+    def save(json: dict, file: str, compress: bool = True):
+        """Saves the JSON object into the specified file
 
-        # Convert the JSON object into a list of hex bytes
-        result = []
-        for char in dumps(json):
-            result.append(hex(ord(char))[2:])
+        :param json: The JSON object to save
+        :param file: The path of the file to save the JSON object into
+        :param compress: Whether or not to zlib-compress the payload
+        """
+        Hexable.save_atomically(file, lambda stream: Hexable.write(json, stream, compress))
 
-        # Save the file separating each line of hex bytes into 16
-        with open(file, "w") as save_file:
-            total_processed = 0
-            for hex_byte in result:
-                save_file.write(hex_byte + " ")
-                total_processed += 1
-                if total_processed % 16 == 0:
-                    save_file.write("\n")
+    @staticmethod
+    def append(json: dict, file: str, compress: bool = True):
+        """Appends the JSON object as a single record to the end of the specified file
+        and waits until it is on disk
+
+        If the record cannot be written whole, the file is cut back to where it ended
+        so a record that was only partly written never hides the records appended after it
+
+        :param json: The JSON object to append
+        :param file: The path of the file to append the JSON object to
+        :param compress: Whether or not to zlib-compress the payload
+        """
+        record = io.BytesIO()
+        Hexable.write(json, record, compress)
+        data = record.getvalue()
+        with open(file, "ab", buffering=0) as append_file:
+            end = append_file.seek(0, os.SEEK_END)
+            try:
+                written = 0
+                while written < len(data):
+                    written += append_file.write(data[written:])
+                os.fsync(append_file.fileno())
+            except BaseException:
+                append_file.truncate(end)
+                raise
+
+    @staticmethod
+    def save_atomically(file: str, write: Callable[[BinaryIO], None],
+                        replace: Callable[[str, str], None] = os.replace):
+        """Saves whatever the write function writes into the specified file
+
+        It is written into a temporary file next to the target which is flushed
+        to disk and then renamed over the target. The target therefore always holds
+        either its old contents or the new ones, even if the game stops mid-write.
+
+        :param file: The path of the file to save into
+        :param write: The function that writes the contents of the file into the binary stream it is given
+        :param replace: The function that renames the temporary file, its first argument, over the target
+        """
+        directory = os.path.dirname(os.path.abspath(file))
+        descriptor, temp_file = tempfile.mkstemp(prefix=f".{os.path.basename(file)}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(descriptor, "wb", buffering=Hexable.BUFFER_SIZE) as save_file:
+                write(save_file)
+                save_file.flush()
+                os.fsync(save_file.fileno())
+            replace(temp_file, file)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        Hexable.sync_directory(directory)
+
+    @staticmethod
+    def sync_directory(directory: str):
+        """Flushes the entries of the directory to disk so that a rename inside it is durable
+
+        Not every platform can open a directory, in which case nothing is done
+
+        :param directory: The path of the directory
+        """
+        try:
+            descriptor = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(descriptor)
+        except OSError:
+            pass
+        finally:
+            os.close(descriptor)
 
     @staticmethod
     def load(file: str) -> dict:
+        """Loads the JSON object stored in the specified file
+
+        If the file is stored in the legacy hex format, it is rewritten
+        in the current format after it is loaded
+
+        :param file: The path of the file to load the JSON object from
+        :raises FileNotFoundError: When the file does not exist
+        :raises ValueError: When the file is not a valid save file
+        """
         if not os.path.exists(file):
             raise FileNotFoundError(f"File, {file} does not exist")
 
-        with open(file) as save_file:
-            hex_data = "".join(save_file.readlines()).strip().split(" ")
+        with Hexable.map(file) as buffer:
+            if buffer[:len(Hexable.MAGIC)] == Hexable.MAGIC:
+                return Hexable.read_buffer(buffer)[0]
+            json = Hexable.decode_legacy(buffer)
+
+        Hexable.save(json, file)
+        return json
+
+    @staticmethod
+    def map(file: str) -> mmap.mmap:
+        """Maps the specified file into memory as a read-only buffer
+
+        :param file: The path of the file to map
+        :raises FileNotFoundError: When the file does not exist
+        :raises ValueError: When the file is empty, which can never be a valid save file
+        """
+        with open(file, "rb") as mapped_file:
+            if os.fstat(mapped_file.fileno()).st_size == 0:
+                raise ValueError(f"File, {file} is empty")
+            return mmap.mmap(mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    @staticmethod
+    def write(json: dict, stream: BinaryIO, compress: bool = True):
+        """Writes the JSON object as a single record into a binary stream
+
+        :param json: The JSON object to write
+        :param stream: The binary stream to write the record into
+        :param compress: Whether or not to zlib-compress the payload
+        """
+        payload = dumps(json, separators=(",", ":")).encode("utf-8")
+        flags = 0
+        if compress:
+            payload = zlib.compress(payload, Hexable.COMPRESSION_LEVEL)
+            flags |= Hexable.FLAG_COMPRESSED
+        stream.write(Hexable.HEADER.pack(Hexable.MAGIC, Hexable.VERSION, flags,
+                                         len(payload), zlib.crc32(payload)))
+        stream.write(payload)
+
+    @staticmethod
+    def read_buffer(buffer: Union[bytes, mmap.mmap, memoryview], offset: int = 0) -> Tuple[dict, int]:
+        """Reads a single record from a buffer, such as a memory-mapped file, and returns
+        its JSON object along with the offset right after the record
+
+        The payload is checked and decompressed straight from the buffer without copying it first
+
+        :param buffer: The buffer to read the record from
+        :param offset: The offset of the record inside of the buffer
+        :raises ValueError: When the record header or payload is invalid
+        """
+        if len(buffer) - offset < Hexable.HEADER.size:
+            raise ValueError("Save record header is truncated")
+        magic, version, flags, length, checksum = Hexable.HEADER.unpack_from(buffer, offset)
+        if magic != Hexable.MAGIC:
+            raise ValueError("Save record does not start with the save file signature")
+        if version > Hexable.VERSION:
+            raise ValueError(f"Save record version {version} is not supported")
+
+        start = offset + Hexable.HEADER.size
+        with memoryview(buffer)[start:start + length] as payload:
+            if len(payload) != length or zlib.crc32(payload) != checksum:
+                raise ValueError("Save record payload is truncated or corrupted")
+            if flags & Hexable.FLAG_COMPRESSED:
+                return loads(zlib.decompress(payload)), start + length
+            return loads(payload.tobytes()), start + length
+
+    @staticmethod
+    def decode_legacy(data: Union[bytes, mmap.mmap]) -> dict:
+        """Decodes the contents of a file saved in the legacy format
+        where each character is stored as a space-separated hex token
+
+        :param data: The raw contents of the legacy file
+        """
 
-        # Convert the list of hex data bytes back into JSON
-        save_json = ""
-        for hex_byte in hex_data:
-            save_json += chr(int(hex_byte, 16))
-        return loads(save_json)
\ No newline at end of file
+        # Every character of the legacy JSON is printable ASCII, written as exactly two hex digits,
+        #   so the whole file can be decoded at once unless it was written some other way
+        try:
+            return loads(bytes.fromhex(data[:].decode("ascii")))
+        except ValueError:
+            return loads("".join([chr(int(hex_byte, 16)) for hex_byte in data[:].split()]))
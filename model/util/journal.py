@@ -0,0 +1,188 @@
+import os
+from typing import List, Optional
+
+from model import Directory, Entry, NormalFile, VirusFile
+from model.util import Hexable
+
+
+class Journal:
+    """A Journal keeps track of every change made to the filesystem of a game save
+    since the last full snapshot of it was saved
+
+    The changes are appended to the journal file as a single record, tagged with the
+    generation of the snapshot they apply to, each time the game is saved, so saving
+    only costs as much as what changed since the last save.
+    Loading a game save replays the journal file on top of the snapshot. Once the
+    journal holds enough changes, the snapshot is rewritten and the journal is cleared.
+
+    Each change is a JSON object with an "op" of:
+        "move"   -> the Entry at "path" was moved into the Directory at "to"
+        "remove" -> the Entry at "path" was removed from the filesystem entirely
+        "add"    -> the Entry in "entry" was added into the Directory at "to"
+    """
+
+    COMPACTION_THRESHOLD = 5000
+
+    def __init__(self):
+        self.__pending: List[dict] = []
+        self.__journaled = 0
+
+    def __len__(self) -> int:
+        return self.__journaled + len(self.__pending)
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def record_move(self, path: str, destination: str):
+        """Records that an Entry was moved into another Directory
+
+        :param path: The path of the Entry before it was moved
+        :param destination: The path of the Directory the Entry was moved into
+        """
+        self.__pending.append({"op": "move", "path": path, "to": destination})
+
+    def record_remove(self, path: str):
+        """Records that an Entry was removed from the filesystem entirely
+
+        :param path: The path of the Entry before it was removed
+        """
+        self.__pending.append({"op": "remove", "path": path})
+
+    def record_add(self, entry: Entry, destination: str):
+        """Records that a new Entry was added to the filesystem
+
+        :param entry: The Entry that was added
+        :param destination: The path of the Directory the Entry was added into
+        """
+        self.__pending.append({"op": "add", "entry": entry.to_json(), "to": destination})
+
+    def get_pending_count(self) -> int:
+        """Returns the amount of changes that have not been written to the journal file yet"""
+        return len(self.__pending)
+
+    def needs_compaction(self) -> bool:
+        """Returns whether or not the journal holds enough changes that the snapshot should be rewritten"""
+        return len(self) >= Journal.COMPACTION_THRESHOLD
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def take(self) -> List[dict]:
+        """Returns the pending changes, which are about to be written to the journal file,
+        and which stay pending until they are committed once they are on disk
+        """
+        return list(self.__pending)
+
+    def commit(self, count: int):
+        """Counts the first pending changes as being in the journal file after they were written to it
+
+        :param count: The amount of changes that were written
+        """
+        del self.__pending[:count]
+        self.__journaled += count
+
+    def clear(self, count: int):
+        """Forgets every change in the journal file, and the first pending changes,
+        after a new snapshot of the filesystem that holds them was saved
+
+        :param count: The amount of pending changes held in the new snapshot
+        """
+        del self.__pending[:count]
+        self.__journaled = 0
+
+    @staticmethod
+    def append(file: str, generation: int, changes: List[dict]):
+        """Appends the changes to the journal file as a single record and waits until it is on disk
+
+        :param file: The path of the journal file
+        :param generation: The generation of the snapshot that the changes apply to
+        :param changes: The changes to append
+        """
+        if not changes:
+            return
+        Hexable.append({"generation": generation, "changes": changes}, file)
+
+    @staticmethod
+    def remove(file: str):
+        """Removes the journal file after a new snapshot of the filesystem has been saved
+
+        :param file: The path of the journal file
+        """
+        if os.path.exists(file):
+            os.remove(file)
+
+    def replay(self, file: str, generation: int, root: Directory, trash: Directory) -> int:
+        """Applies every change in the journal file to the filesystem and returns how many were applied
+
+        A record that was only partly written, because the game stopped while saving,
+        ends the journal since nothing after it can be trusted. Records of a different
+        generation than the snapshot, which are left behind when the game stopped
+        right after writing a new snapshot, are skipped.
+
+        :param file: The path of the journal file
+        :param generation: The generation of the snapshot that the filesystem was loaded from
+        :param root: The root Directory of the filesystem
+        :param trash: The Trash Directory of the filesystem
+        """
+        self.__pending = []
+        self.__journaled = 0
+        if not os.path.exists(file):
+            return 0
+
+        try:
+            journal_file = Hexable.map(file)
+        except ValueError:
+            return 0
+        with journal_file:
+            offset = 0
+            while offset < len(journal_file):
+                try:
+                    record, offset = Hexable.read_buffer(journal_file, offset)
+                except ValueError:
+                    break
+                if record.get("generation", 0) != generation:
+                    continue
+                for change in record["changes"]:
+                    Journal.__apply(change, root, trash)
+                self.__journaled += len(record["changes"])
+        return self.__journaled
+
+    @staticmethod
+    def __apply(change: dict, root: Directory, trash: Directory):
+        """Applies a single change to the filesystem"""
+        if change["op"] == "add":
+            destination = Journal.__resolve(change["to"], root, trash)
+            if not isinstance(destination, Directory):
+                return
+            json = change["entry"]
+            if json["type"] == "VirusFile":
+                entry = VirusFile.from_json(json)
+            elif json["type"] == "NormalFile":
+                entry = NormalFile.from_json(json)
+            else:
+                entry = Directory.from_json(json)
+            entry.set_parent(destination)
+            destination.add_entry(entry)
+            return
+
+        entry = Journal.__resolve(change["path"], root, trash)
+        if entry is None or entry.get_parent() is None:
+            return
+        if change["op"] == "remove":
+            entry.get_parent().remove_entry(entry, recursive=True)
+            return
+        destination = Journal.__resolve(change["to"], root, trash)
+        if not isinstance(destination, Directory) or destination.get_entry(entry.get_name()) is not None:
+            return
+        if isinstance(entry, Directory) and destination is trash and entry.get_parent() is not trash:
+            entry.set_original_parent(entry.get_parent())
+        elif isinstance(entry, Directory) and entry.get_parent() is trash and destination is not trash:
+            entry.set_original_parent(None)
+        entry.get_parent().remove_entry(entry, recursive=True)
+        entry.set_parent(destination)
+        destination.add_entry(entry)
+
+    @staticmethod
+    def __resolve(path: str, root: Directory, trash: Directory) -> Optional[Entry]:
+        """Returns the Entry at the path which is either in the filesystem or in the Trash"""
+        if path.split("/", 1)[0] == trash.get_name():
+            return trash.resolve(path)
+        return root.resolve(path)
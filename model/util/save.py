@@ -1,10 +1,15 @@
 import os
 from pathlib import Path
-from typing import List, Tuple
+from random import Random, getrandbits
+from time import perf_counter, time
+from threading import Lock, RLock
+from typing import ContextManager, Dict, Iterable, List, Optional, Tuple
 
-from model import Directory, VirusFile
+from model import Directory, Entry, FilesystemTable, NormalFile, VirusFile
 from model.error import InvalidNameError
-from model.util import generate_filesystem, Hexable, choose_random_directory, generate_virus
+from model.util import generate_filesystem, DeletionLog, FilesystemStore, Hexable, Journal
+from model.util import VirusTracker, choose_random_directory, generate_virus
+from model.util import OBJECT_BACKEND, TABLE_BACKEND, LEGACY_SAMPLING
 
 
 class Save:
@@ -12,74 +17,165 @@ class Save:
     from the disk given a username
 
     :param username: The username of the game save to use
+    :param seed: The seed to generate the filesystem of a new game save from
+    :param backend: Whether the filesystem is held as objects (OBJECT_BACKEND) or
+        in a FilesystemTable (TABLE_BACKEND) which is meant for very large filesystems.
+        Only older game saves, held in a single record, are loaded into the backend;
+        every other game save reads its Directories from its snapshot when they are first used
+    :param directories: The amount of top-level directories to generate inside the user directory
+        of a new game save, which is what controls the size of the filesystem
     :raises InvalidNameError: When the username has an invalid path character
     """
 
     @staticmethod
     def load_saves() -> List['Save']:
-        """Loads all the saves from the Save folder and returns them in a list"""
+        """Loads the summary of all the saves from the Save folder and returns them in a list
+
+        Only the summary file of each save is read, and only when it changed since it was last read,
+        so the full save is not loaded until the game save is picked to be played
+        """
 
         # Check if the save folder exists; If not, create it
         if not os.path.exists(Save.SAVE_FOLDER):
             os.makedirs(Save.SAVE_FOLDER)
 
-        files = []
-        for entry in os.listdir(Save.SAVE_FOLDER):
+        saves = []
+        for entry in sorted(os.listdir(Save.SAVE_FOLDER)):
             if os.path.isdir(f"{Save.SAVE_FOLDER}/{entry}"):
                 username = entry
-                files.append(Save(username))
-        saves = []
-        for i in range(len(files)):
-            try:
-                saves.append(files[i])
-                saves[i].load()
-            except FileNotFoundError:
-                print(f"issue loading {files[i].get_username()}")
+                saves.append(Save(username))
+                try:
+                    saves[-1].load_summary()
+                except FileNotFoundError:
+
+                    # Saves from before summary files existed are loaded in full once to create the summary
+                    try:
+                        saves[-1].load()
+                        saves[-1].save_summary()
+                    except FileNotFoundError:
+                        print(f"issue loading {username}")
         return saves
 
+    # The summaries that have been read, by username, along with the time their file was last modified
+    __summaries: Dict[str, Tuple[int, dict]] = {}
+
     INVALID_CHARS = "?&:;|[]*,\""
     SAVE_FOLDER = f"{Path.home()}/virus.sh/saves"
+    VIRUS_WEIGHT = 0.7
+    NORMAL_WEIGHT = 0.3
     MINIMUM_SPEED = 2
     SPEED_INTERVAL = 2
 
     # # # # # # # # # # # # # # # # # # # #
 
-    def __init__(self, username: str):
+    def __init__(self, username: str, seed: int = None, backend: str = OBJECT_BACKEND, directories: int = 10):
         for invalid_char in Save.INVALID_CHARS:
             if username.find(invalid_char) != -1:
                 raise InvalidNameError(f"{invalid_char} cannot exist in username.")
         self.__username = username
+        self.__seed = getrandbits(64) if seed is None else seed
+        self.__backend = backend
+        self.__directories = directories
         self.__root = None
         self.__trash = None
         self.__virus_files = self.__deleted_virus_files = 0
         self.__normal_files = self.__deleted_normal_files = self.__restored = 0
-        self.__tracked_files = []
-        self.__deletion_log: List[Tuple[int, str, str]] = []
+        self.__tracked_files = VirusTracker()
+        self.__deletion_log = DeletionLog()
         self.__speed = 30  # Time in seconds that a file is deleted
+        self.__sampling_policy = LEGACY_SAMPLING
         self.__virus_file_locations = {}
+        self.__journal = Journal()
+        self.__store: Optional[FilesystemStore] = None
+        self.__generation = 0
+        self.__last_saved = None
+        self.__load_report = None
+        self.__random = self.__create_random()
+
+        # Every change to the filesystem, and every read of it that must be consistent,
+        #   happens while holding this lock since the Virus may run on another thread
+        self.__lock = RLock()
+        self.__write_lock = Lock()
 
     # # # # # # # # # # # # # # # # # # # #
 
     def generate(self):
         """Tells the Save object to create a new game save with the
         specified username or to load the existing game save
+
+        Loading the game save is timed, which is reported by get_load_report()
         """
+        self.close()
         try:
+            start = perf_counter()
             self.load()
-            system_json = Hexable.load(f"{Save.SAVE_FOLDER}/{self.get_username()}/filesystem.hex")
-            self.__root = Directory.from_json(system_json["root"])
-            self.__trash = Directory.from_json(system_json["trash"])
+
+            # Directories are only read from the snapshot when they are first used
+            #   while older game saves hold the whole filesystem in a single record
+            if os.path.exists(self.__get_file("directories.hex")):
+                self.__store = FilesystemStore(self.__get_file("directories.hex"))
+                self.__root = self.__store.get_root()
+                self.__trash = self.__store.get_trash()
+                self.__generation = self.__store.get_generation()
+            else:
+                system_json = Hexable.load(self.__get_file("filesystem.hex"))
+                if self.__backend == TABLE_BACKEND:
+                    self.__root = FilesystemTable.from_json(system_json["root"]).get_view()
+                else:
+                    self.__root = Directory.from_json(system_json["root"])
+                self.__trash = Directory.from_json(system_json["trash"])
+                self.__generation = system_json.get("generation", 0)
+            self.__journal.replay(self.__get_file("journal.hex"), self.__generation, self.__root, self.__trash)
+            self.__tracked_files.resolve(self.__root)
+            self.__load_report = {"seconds": perf_counter() - start}
         except FileNotFoundError:
-            self.__root, total_files, self.__virus_file_locations = generate_filesystem(self.__username)
+            self.__root, total_files, self.__virus_file_locations = generate_filesystem(
+                self.__username, self.__seed, self.__directories, self.__backend)
             self.__trash = Directory("Trash")
             self.__normal_files = total_files
             self.__virus_files = total_files // 1000
             self.save()
+        self.__random = self.__create_random()
+
+    def __create_random(self) -> Random:
+        """Returns the random number generator for the choices made while the game save is played,
+        which is seeded from the seed of the game save and how far the game has gone so playing
+        the same commands from the same point of a game save always makes the same choices
+        """
+        return Random(NormalFile.derive_seed(
+            self.__seed, f"{self.__deleted_normal_files}/{self.__deleted_virus_files}/{self.__virus_files}"))
+
+    def close(self):
+        """Unmaps the snapshot that the Directories of the game save are read from, if it was loaded from one,
+        once the game save is no longer played. Its filesystem cannot be used again until it is generated again
+        """
+        with self.__lock:
+            if self.__store is not None:
+                self.__store.close()
+                self.__store = None
+
+    def transaction(self) -> ContextManager:
+        """Returns a context manager that holds the lock on the filesystem of the game save
+
+        Every change to the filesystem goes through the methods of the Save which hold this lock
+        so a group of reads and changes made while holding it is never interleaved with the Virus
+        """
+        return self.__lock
+
+    def get_load_report(self) -> Optional[dict]:
+        """Returns how long loading the game save took, in seconds,
+        or None if the game save was created instead of loaded
+        """
+        return self.__load_report
 
     def get_username(self) -> str:
         """Returns the username for the game save"""
         return self.__username
 
+    def get_seed(self) -> int:
+        """Returns the seed that the filesystem of the game save is generated from"""
+        return self.__seed
+
     def get_root(self) -> Directory:
         """Returns the root of the filesystem for the game save"""
         return self.__root
@@ -88,10 +184,33 @@ class Save:
         """Returns the Trash directory for the game save"""
         return self.__trash
 
-    def get_speed(self) -> int:
+    def get_random(self) -> Random:
+        """Returns the random number generator that the Virus, and the game save itself,
+        make their choices with while the game save is played
+        """
+        return self.__random
+
+    def get_speed(self) -> float:
         """Returns the speed at which a file is deleted by the virus, in seconds"""
         return self.__speed
 
+    def set_speed(self, speed: float):
+        """Sets the speed at which a file is deleted by the virus, in seconds
+        which can be less than a second
+        """
+        self.__speed = speed
+
+    def get_sampling_policy(self) -> str:
+        """Returns the policy that the virus chooses files and directories with"""
+        return self.__sampling_policy
+
+    def set_sampling_policy(self, policy: str):
+        """Sets the policy that the virus chooses files and directories with
+
+        :param policy: One of LEGACY_SAMPLING, UNIFORM_SAMPLING or DEPTH_WEIGHTED_SAMPLING
+        """
+        self.__sampling_policy = policy
+
     def get_virus_files(self) -> Tuple[int, int]:
         """Returns a 2-tuple of the amount of deleted virus files and the total amount of virus files"""
         return self.__deleted_virus_files, self.__virus_files
@@ -100,13 +219,31 @@ class Save:
         """Returns a 2-tuple of the amount of deleted normal files and the total amount of normal files"""
         return self.__deleted_normal_files, self.__normal_files
 
+    def get_remaining_files(self) -> int:
+        """Returns the amount of normal files that are still left on the filesystem"""
+        return self.__root.get_normal_file_count()
+
     def get_restored_files(self) -> int:
         """Returns the amount of normal files that have been restored"""
         return self.__restored
 
-    def get_deletion_log(self) -> List[Tuple[int, str, str]]:
-        """Returns the log of files, with their full paths, that are deleted by the virus"""
-        return list(self.__deletion_log)
+    def get_completion(self) -> float:
+        """Returns how much of the game has been completed, as a percentage, which is never more than 100"""
+        virus_files = self.__virus_files if self.__virus_files != 0 else 1
+        deleted_files = self.__deleted_normal_files if self.__deleted_normal_files != 0 else 1
+        return min(100.0, round(
+            Save.VIRUS_WEIGHT * min(self.__deleted_virus_files / virus_files, 1) * 100 +
+            Save.NORMAL_WEIGHT * min(self.__restored / deleted_files, 1) * 100, 2))
+
+    def get_last_saved(self) -> Optional[float]:
+        """Returns the time the game save was last saved at, if known, in seconds since the epoch"""
+        return self.__last_saved
+
+    def get_deletion_log(self) -> DeletionLog:
+        """Returns the log of files, with their full paths, that are deleted by the virus
+        which is a read-only view of the log that keeps growing as the game is played
+        """
+        return self.__deletion_log
 
     def log_deletion(self, virus_id: int, file: str):
         """Logs a deletion of a file by the virus
@@ -114,21 +251,144 @@ class Save:
         :param virus_id: The file number of the Virus that deleted the file
         :param file: The total pathname of the file that was deleted
         """
-        self.__deleted_normal_files += 1
-        self.__deletion_log.append((virus_id, file, self.__virus_file_locations[str(virus_id)]))
+        with self.__lock:
+            self.__deleted_normal_files += 1
+            self.__deletion_log._append(virus_id, file, self.__virus_file_locations[str(virus_id)], time())
 
-    def get_tracked_files(self) -> List[str]:
-        """Returns a list of tracked files including the full path"""
-        return list(self.__tracked_files)
+    def get_tracked_files(self) -> VirusTracker:
+        """Returns the virus files that the player has tracked, by the number they were tracked under"""
+        return self.__tracked_files
 
     def track_virus(self, virus_id: int, file: VirusFile):
-        """Keeps track of a virus file by storing the parent Directory of the
-        virus file
+        """Keeps track of a virus file under a number, which follows
+        the virus file wherever it is moved to
         """
-        while len(self.__tracked_files) < self.__virus_files:
-            self.__tracked_files.append(None)
-        if isinstance(file, VirusFile) and 0 < virus_id <= len(self.__tracked_files):
-            self.__tracked_files[virus_id - 1] = str(file)
+        with self.__lock:
+            if isinstance(file, VirusFile) and 0 < virus_id <= self.__virus_files:
+                self.__tracked_files.track(virus_id, file)
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def move_entries(self, entries: Iterable[Entry], destination: Directory) -> List[Entry]:
+        """Moves the Entries, along with everything inside of them, into the destination Directory
+        and returns the Entries that could not be moved
+
+        The Entries are taken out of each parent Directory, and added into the destination, in a single batch
+        so a Directory is moved in one step no matter how much is inside of it.
+        An Entry is not moved if an Entry with the same name already exists in the destination
+
+        :param entries: The Entries to move
+        :param destination: The Directory to move the Entries into
+        """
+        with self.__lock:
+            moved = []
+            rejected = []
+            paths = []
+            names = set()
+            parents: Dict[int, Tuple[Directory, List[Entry]]] = {}
+            for entry in entries:
+                if entry.get_name() in names or destination.get_entry(entry.get_name()) is not None:
+                    rejected.append(entry)
+                    continue
+                names.add(entry.get_name())
+                moved.append(entry)
+                paths.append(str(entry))
+                parent = entry.get_parent()
+                if parent is not None:
+                    parents.setdefault(id(parent), (parent, []))[1].append(entry)
+
+            for parent, children in parents.values():
+                parent.remove_entries(children, recursive=True)
+            for entry in moved:
+                entry.set_parent(destination)
+            destination.add_entries(*moved)
+            for path in paths:
+                self.__journal.record_move(path, str(destination))
+            return rejected
+
+    def delete_entries(self, entries: Iterable[Entry]) -> List[Entry]:
+        """Moves the Entries into the Trash and returns the Entries that could not be moved
+        since an Entry with the same name is already in the Trash
+
+        Directories remember the Directory they were deleted from so they can be restored to it,
+        while files always remember the Directory they started out in
+
+        :param entries: The Entries to delete
+        """
+        with self.__lock:
+            entries = list(entries)
+            deleted = [entry for entry in entries
+                       if isinstance(entry, Directory) and entry.get_parent() is not self.__trash]
+            for entry in deleted:
+                entry.set_original_parent(entry.get_parent())
+            rejected = self.move_entries(entries, self.__trash)
+            rejected_ids = {id(entry) for entry in rejected}
+            for entry in deleted:
+                if id(entry) in rejected_ids:
+                    entry.set_original_parent(None)
+            return rejected
+
+    def restore_entries(self, entries: Iterable[Entry]) -> List[Entry]:
+        """Restores the Entries from the Trash to their original parents and returns the Entries that were restored
+
+        The Entries are grouped by their original parent so each parent is found only once, through an index
+        of the paths found so far, and every Entry going into the same parent is added to it in a single batch.
+        An Entry is left in the Trash if it has no original parent, its original parent no longer exists,
+        or an Entry with the same name already exists in its original parent
+
+        :param entries: The Entries in the Trash to restore
+        """
+        with self.__lock:
+            groups: Dict[str, List[Entry]] = {}
+            for entry in entries:
+                if entry.get_parent() is self.__trash and entry.get_original_parent() is not None:
+                    groups.setdefault(entry.get_original_parent(), []).append(entry)
+
+            # Shallower parents are restored into first since a Directory being restored
+            #   may be the original parent of other Entries being restored
+            restored = []
+            index: Dict[str, Optional[Directory]] = {}
+            for path in sorted(groups, key=lambda path: path.count("/")):
+                target = self.__resolve_directory(path, index)
+                if target is None:
+                    continue
+                names = set()
+                group = []
+                for entry in groups[path]:
+                    if entry.get_name() not in names and target.get_entry(entry.get_name()) is None:
+                        names.add(entry.get_name())
+                        group.append(entry)
+                if not group:
+                    continue
+
+                # Only the files that the Virus deleted count as restored, which it only ever moves
+                #   into the Trash one at a time, so they are never inside of a Directory being restored
+                self.__trash.remove_entries(group, recursive=True)
+                for entry in group:
+                    self.__journal.record_move(f"{self.__trash}/{entry.get_name()}", path)
+                    entry.set_parent(target)
+                    if isinstance(entry, Directory):
+                        entry.set_original_parent(None)
+                    elif (isinstance(entry, NormalFile) and not isinstance(entry, VirusFile) and
+                          self.__deletion_log.mark_restored(f"{path}/{entry.get_name()}")):
+                        self.__restored += 1
+                target.add_entries(*group)
+                restored.extend(group)
+            return restored
+
+    def __resolve_directory(self, path: str, index: Dict[str, Optional[Directory]]) -> Optional[Directory]:
+        """Returns the Directory at the full path, if it exists, using the Directories
+        in the index to find it and adding it, and every Directory above it, to the index
+        """
+        if path not in index:
+            parent_path, _, name = path.rpartition("/")
+            if not parent_path:
+                directory = self.__root if path == self.__root.get_name() else None
+            else:
+                parent = self.__resolve_directory(parent_path, index)
+                directory = parent.get_entry(name) if parent is not None else None
+            index[path] = directory if isinstance(directory, Directory) else None
+        return index[path]
 
     # # # # # # # # # # # # # # # # # # # #
 
@@ -136,46 +396,54 @@ class Save:
         """Increases the speed of the deletion by the virus and moves
         the specified virus file to a new, random location
         In addition, a new virus file is generated somewhere on the system
+
+        If the virus file was tracked, it stays tracked at its new location
         """
-        self.__virus_files += 1
-        if self.__speed > Save.MINIMUM_SPEED:
-            self.__speed -= Save.SPEED_INTERVAL
-        while len(self.__tracked_files) < self.__virus_files:
-            self.__tracked_files.append(None)
-        if str(virus_file) in self.__tracked_files:
-            index = self.__tracked_files.index(str(virus_file))
-            self.__tracked_files[index] = None
+        with self.__lock:
+            self.__virus_files += 1
+            if self.__speed > Save.MINIMUM_SPEED:
+                self.__speed -= Save.SPEED_INTERVAL
 
-        new_dir = choose_random_directory(self.__root)
-        old_dir = virus_file.get_parent()
-        old_dir.remove_entry(virus_file)
-        virus_file.set_parent(new_dir)
-        new_dir.add_entry(virus_file)
+            new_dir = choose_random_directory(self.__root, self.__random, self.__sampling_policy)
+            self.move_entries([virus_file], new_dir)
 
-        virus_file_2nd_parent = generate_virus(self.__root, self.__virus_files)
-        self.__virus_file_locations[str(self.__virus_files)] = virus_file_2nd_parent
+            virus_file_2nd_parent = generate_virus(self.__root, self.__virus_files, seed=self.__seed,
+                                                   rng=self.__random)
+            self.__virus_file_locations[str(self.__virus_files)] = virus_file_2nd_parent
+            for entry in self.__root.get_entries():
+                if isinstance(entry, VirusFile) and entry.get_number() == self.__virus_files:
+                    self.__journal.record_add(entry, str(self.__root))
 
     def remove_virus(self, virus_file: VirusFile):
         """Removes the given virus file from the list of possible
         viruses to be used to delete any files on the system
         """
-        self.__deleted_virus_files += 1
-        old_dir = virus_file.get_parent()
-        old_dir.remove_entry(virus_file)
-        if str(virus_file) in self.__tracked_files:
-            index = self.__tracked_files.index(str(virus_file))
-            self.__tracked_files[index] = None
-
-    def restored_file(self):
-        """Restores the specified file to its original parent and returns
-        the updated file object.
-        """
-        self.__restored += 1
+        with self.__lock:
+            self.__deleted_virus_files += 1
+            self.__tracked_files.untrack(virus_file)
+            self.__journal.record_remove(str(virus_file))
+            old_dir = virus_file.get_parent()
+            old_dir.remove_entry(virus_file)
 
     # # # # # # # # # # # # # # # # # # # #
 
-    def save(self):
-        """Saves the current state of the game into a custom file"""
+    def __get_file(self, name: str) -> str:
+        """Returns the path of a file inside the folder of this game save"""
+        return f"{Save.SAVE_FOLDER}/{self.__username}/{name}"
+
+    def save(self, compact: bool = False):
+        """Saves the current state of the game into a custom file
+
+        Only the changes made to the filesystem since the last save are written, into the journal,
+        unless the journal has grown large enough that a new snapshot of the filesystem is written instead
+
+        A consistent copy of the game save is taken while holding the lock on the filesystem, which for a new
+        snapshot only copies the Entries of each Directory, but the JSON objects are created and the files
+        are written after it is released so the game can go on in the meantime.
+        This can be called from any thread, and saves are written one at a time in the order they were taken.
+
+        :param compact: Whether or not to write a new snapshot of the filesystem no matter the size of the journal
+        """
 
         # Create the game saves directory if necessary
         if not os.path.exists(Save.SAVE_FOLDER):
@@ -185,28 +453,128 @@ class Save:
         if not os.path.exists(f"{Save.SAVE_FOLDER}/{self.get_username()}"):
             os.mkdir(f"{Save.SAVE_FOLDER}/{self.get_username()}")
 
-        save_json = {
+        with self.__write_lock:
+            with self.__lock:
+                save_json = {
+                    "username": self.__username,
+                    "seed": self.__seed,
+                    "backend": self.__backend,
+                    "speed": self.__speed,
+                    "sampling": self.__sampling_policy,
+                    "virus_files": {
+                        "deleted": self.__deleted_virus_files,
+                        "total": self.__virus_files,
+                        "tracked": self.__tracked_files.to_json(),
+                        "locations": dict(self.__virus_file_locations)
+                    },
+                    "normal_files": {
+                        "deleted": self.__deleted_normal_files,
+                        "total": self.__normal_files,
+                        "restored": self.__restored,
+                        "restored_entries": self.__deletion_log.get_restored(),
+                        "log_length": len(self.__deletion_log)
+                    }
+                }
+                self.__last_saved = time()
+                summary_json = self.__summary_json()
+                log_record = self.__deletion_log.take()
+                generation = self.__generation
+                compact = (compact or self.__journal.needs_compaction() or
+                           not os.path.exists(self.__get_file("directories.hex")))
+                if compact:
+                    generation += 1
+                    snapshotted = self.__journal.get_pending_count()
+                    root_snapshot = self.__root.snapshot()
+                    trash_snapshot = self.__trash.snapshot()
+                else:
+                    changes = self.__journal.take()
+
+            # Nothing is counted as saved until it is on disk, so whatever a failed write held
+            #   is written by the next save. The snapshot is written before the old journal is removed,
+            #   and the journal is written before save.hex, so a game that stops in between never loses a change
+            if compact:
+                records = {}
+                root_json, trash_json = root_snapshot(records), trash_snapshot(records)
+                FilesystemStore.save(self.__get_file("directories.hex"), root_json, trash_json, generation,
+                                     lambda temp_file, file, written: self.__replace_store(
+                                         temp_file, file, {record: written[key] for key, record in records.items()}))
+                with self.__lock:
+                    self.__generation = generation
+                    self.__journal.clear(snapshotted)
+                Journal.remove(self.__get_file("journal.hex"))
+                if os.path.exists(self.__get_file("filesystem.hex")):
+                    os.remove(self.__get_file("filesystem.hex"))
+            else:
+                Journal.append(self.__get_file("journal.hex"), generation, changes)
+                with self.__lock:
+                    self.__journal.commit(len(changes))
+            DeletionLog.append(self.__get_file("deletions.hex"), log_record)
+            with self.__lock:
+                self.__deletion_log.commit(log_record)
+            Hexable.save(save_json, self.__get_file("save.hex"))
+            Hexable.save(summary_json, self.__get_file("summary.hex"))
+
+    def __replace_store(self, temp_file: str, file: str, records: Dict[int, int]):
+        """Renames a new snapshot of the filesystem over the old one
+
+        The Directories that have not been read from the old snapshot yet are then read from the new one,
+        which is done while holding the lock on the filesystem so none of them is read in the meantime
+
+        :param temp_file: The path of the new snapshot
+        :param file: The path of the old snapshot
+        :param records: The record in the new snapshot of each record of the old snapshot that it holds
+        """
+        with self.__lock:
+            if self.__store is None:
+                os.replace(temp_file, file)
+            else:
+                self.__store.replace(temp_file, file, records)
+
+    def save_summary(self):
+        """Saves only the summary of the game save which is what the main menu shows"""
+        with self.__lock:
+            summary_json = self.__summary_json()
+        Hexable.save(summary_json, self.__get_file("summary.hex"))
+
+    def __summary_json(self) -> dict:
+        """Returns the JSON object of the summary of the game save"""
+        return {
             "username": self.__username,
-            "speed": self.__speed,
+            "saved": self.__last_saved,
+            "completed": self.get_completion(),
             "virus_files": {
                 "deleted": self.__deleted_virus_files,
-                "total": self.__virus_files,
-                "tracked": self.__tracked_files,
-                "locations": self.__virus_file_locations
+                "total": self.__virus_files
             },
             "normal_files": {
                 "deleted": self.__deleted_normal_files,
                 "total": self.__normal_files,
-                "restored": self.__restored,
-                "log": self.__deletion_log
+                "restored": self.__restored
             }
         }
-        system_json = {
-            "root": self.__root.to_json(),
-            "trash": self.__trash.to_json()
-        }
-        Hexable.save(save_json, f"{Save.SAVE_FOLDER}/{self.get_username()}/save.hex")
-        Hexable.save(system_json, f"{Save.SAVE_FOLDER}/{self.get_username()}/filesystem.hex")
+
+    def load_summary(self):
+        """Loads only the summary of the game save, which is enough to show it in the main menu
+
+        The summary is only read from its file again when the file has changed
+
+        :raises FileNotFoundError: When the summary file for the username does not exist
+        """
+        file = self.__get_file("summary.hex")
+        modified = os.stat(file).st_mtime_ns
+        cached = Save.__summaries.get(self.__username)
+        if cached is not None and cached[0] == modified:
+            summary_json = cached[1]
+        else:
+            summary_json = Hexable.load(file)
+            Save.__summaries[self.__username] = (modified, summary_json)
+
+        self.__last_saved = summary_json.get("saved")
+        self.__deleted_virus_files = summary_json["virus_files"]["deleted"]
+        self.__virus_files = summary_json["virus_files"]["total"]
+        self.__deleted_normal_files = summary_json["normal_files"]["deleted"]
+        self.__normal_files = summary_json["normal_files"]["total"]
+        self.__restored = summary_json["normal_files"]["restored"]
 
     def load(self):
         """Loads a save file based on the username, if it exists
@@ -214,15 +582,24 @@ class Save:
         :raises FileNotFoundError: When the save file for the username does not exist
         """
         save_json = Hexable.load(f"{Save.SAVE_FOLDER}/{self.__username}/save.hex")
+        self.__last_saved = os.path.getmtime(f"{Save.SAVE_FOLDER}/{self.__username}/save.hex")
 
         self.__speed = save_json.get("speed", 60)
+        self.__seed = save_json.get("seed", self.__seed)
+        self.__backend = save_json.get("backend", OBJECT_BACKEND)
+        self.__sampling_policy = save_json.get("sampling", LEGACY_SAMPLING)
 
         self.__deleted_virus_files = save_json["virus_files"]["deleted"]
         self.__virus_files = save_json["virus_files"]["total"]
-        self.__tracked_files = save_json["virus_files"]["tracked"]
+        self.__tracked_files = VirusTracker.from_json(save_json["virus_files"]["tracked"])
         self.__virus_file_locations = save_json["virus_files"]["locations"]
 
         self.__deleted_normal_files = save_json["normal_files"]["deleted"]
         self.__normal_files = save_json["normal_files"]["total"]
         self.__restored = save_json["normal_files"]["restored"]
-        self.__deletion_log = save_json["normal_files"]["log"]
+        if "log" in save_json["normal_files"]:
+            self.__deletion_log = DeletionLog.from_entries(save_json["normal_files"]["log"])
+        else:
+            self.__deletion_log = DeletionLog.load(self.__get_file("deletions.hex"),
+                                                   save_json["normal_files"]["log_length"])
+        self.__deletion_log.set_restored(save_json["normal_files"].get("restored_entries", ()))
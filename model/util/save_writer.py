@@ -0,0 +1,55 @@
+from queue import Queue
+from threading import Lock, Thread
+
+from model.util import Save
+
+
+class SaveWriter:
+    """The SaveWriter saves games on a background thread so that saving
+    a large game never freezes the console
+
+    A game that is submitted again before its previous save has started is only saved once.
+    """
+
+    __instance = None
+
+    @staticmethod
+    def get_instance() -> 'SaveWriter':
+        if SaveWriter.__instance is None:
+            SaveWriter.__instance = SaveWriter()
+        return SaveWriter.__instance
+
+    def __init__(self):
+        self.__queue = Queue()
+        self.__pending = set()
+        self.__lock = Lock()
+        self.__thread = Thread(target=self.__run, name="SaveWriter", daemon=True)
+        self.__thread.start()
+
+    def submit(self, save: Save):
+        """Saves the game on the background thread
+
+        :param save: The game save to save
+        """
+        with self.__lock:
+            if id(save) in self.__pending:
+                return
+            self.__pending.add(id(save))
+        self.__queue.put(save)
+
+    def flush(self):
+        """Waits until every submitted game has been saved"""
+        self.__queue.join()
+
+    def __run(self):
+        """Saves the submitted games one after another for as long as the game runs"""
+        while True:
+            save = self.__queue.get()
+            with self.__lock:
+                self.__pending.discard(id(save))
+            try:
+                save.save()
+            except OSError as error:
+                print(f"issue saving {save.get_username()}: {error}")
+            finally:
+                self.__queue.task_done()
@@ -0,0 +1,149 @@
+import asyncio
+from heapq import heappop, heappush
+from itertools import count
+from math import ceil
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class Scheduler:
+    """The Scheduler is a single timer queue that is shared by every running Virus
+    so that any amount of games can run without an OS thread for each of them
+
+    Timers are kept in a heap ordered by their deadline and are fired from the
+    thread that drives the Scheduler which is either the Tk event loop through
+    after(), an asyncio event loop, or anything that calls run_due() itself.
+
+    Only a single wake-up is ever pending with the driver: the one for the earliest deadline.
+    """
+
+    __instance = None
+
+    @staticmethod
+    def get_instance() -> 'Scheduler':
+        if Scheduler.__instance is None:
+            Scheduler.__instance = Scheduler()
+        return Scheduler.__instance
+
+    def __init__(self, clock: Callable[[], float] = monotonic):
+        self.__clock = clock
+        self.__heap: List[Tuple[float, int]] = []
+        self.__callbacks: Dict[int, Callable[[], None]] = {}
+        self.__ids = count(1)
+
+        # The Tk widget or asyncio event that wakes the driver for the next deadline
+        self.__widget = None
+        self.__after_id = None
+        self.__wake_event: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self.__callbacks)
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def get_time(self) -> float:
+        """Returns the current time of the clock the Scheduler runs on, in seconds"""
+        return self.__clock()
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> int:
+        """Schedules the callback to be called after the delay and returns the id of the timer
+
+        :param delay: The amount of seconds to wait before calling the callback
+        :param callback: The function to call once the delay has passed
+        """
+        timer = next(self.__ids)
+        deadline = self.__clock() + max(delay, 0)
+        is_earliest = not self.__heap or deadline < self.__heap[0][0]
+        heappush(self.__heap, (deadline, timer))
+        self.__callbacks[timer] = callback
+        if is_earliest:
+            self.__wake()
+        return timer
+
+    def cancel(self, timer: int) -> bool:
+        """Cancels the timer so that its callback is never called
+        and returns whether or not the timer was still pending
+
+        :param timer: The id of the timer returned by schedule
+        """
+        return self.__callbacks.pop(timer, None) is not None
+
+    def get_next_delay(self) -> Optional[float]:
+        """Returns the amount of seconds until the earliest pending timer is due,
+        or None if there are no pending timers
+        """
+        self.__drop_cancelled()
+        if not self.__heap:
+            return None
+        return max(self.__heap[0][0] - self.__clock(), 0)
+
+    def run_due(self, now: float = None) -> int:
+        """Calls the callback of every timer that is due and returns how many were called
+
+        Timers scheduled by those callbacks are not called until the next time this runs
+        even if they are already due
+
+        :param now: The time to consider as the current time, which defaults to the clock's time
+        """
+        if now is None:
+            now = self.__clock()
+        due = []
+        while self.__heap and self.__heap[0][0] <= now:
+            due.append(heappop(self.__heap)[1])
+
+        # A callback may cancel timers that are also due so each one is looked up right before it is called
+        called = 0
+        for timer in due:
+            callback = self.__callbacks.pop(timer, None)
+            if callback is not None:
+                callback()
+                called += 1
+        return called
+
+    def __drop_cancelled(self):
+        """Removes cancelled timers from the front of the heap"""
+        while self.__heap and self.__heap[0][1] not in self.__callbacks:
+            heappop(self.__heap)
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def attach_tk(self, widget):
+        """Drives the Scheduler from the Tk event loop of the widget using after()
+
+        :param widget: Any Tk widget whose after() and after_cancel() methods can be used
+        """
+        self.__widget = widget
+        self.__wake()
+
+    async def run_async(self):
+        """Drives the Scheduler from the running asyncio event loop until it is cancelled"""
+        self.__wake_event = asyncio.Event()
+        try:
+            while True:
+                self.run_due()
+                self.__wake_event.clear()
+                try:
+                    await asyncio.wait_for(self.__wake_event.wait(), self.get_next_delay())
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.__wake_event = None
+
+    def __wake(self):
+        """Tells the driver of the Scheduler that the earliest deadline has changed"""
+        if self.__wake_event is not None:
+            self.__wake_event.set()
+        if self.__widget is None:
+            return
+        if self.__after_id is not None:
+            self.__widget.after_cancel(self.__after_id)
+            self.__after_id = None
+        delay = self.get_next_delay()
+        if delay is not None:
+            self.__after_id = self.__widget.after(ceil(delay * 1000), self.__on_tk_wake)
+
+    def __on_tk_wake(self):
+        """Runs the due timers when the Tk event loop wakes the Scheduler up"""
+        self.__after_id = None
+        self.run_due()
+        self.__wake()
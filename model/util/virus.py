@@ -1,52 +1,100 @@
-from random import randint
-from threading import Thread
-from time import sleep
+from typing import Optional
 
-from model.util import Save, choose_random_file
+from model import Directory, NormalFile
+from model.util import Save, Scheduler, choose_random_file
 
 
-class Virus(Thread):
-    """The Virus Thread works separately from the main game thread
-    and deletes a file at the speed of which the game holds
+class Virus:
+    """The Virus deletes a file at the speed of which the game holds
+
+    Deletions are timers on a Scheduler, which is shared by every Virus, instead of
+    a separate thread for each Virus so stopping a Virus takes effect immediately.
+    Every choice it makes is drawn from the random number generator of the Save,
+    so the same game played the same way is always attacked the same way
 
     :param save: The Save object that the Virus is working on
     :param callback: The function that will be called if the Virus successfully
         deletes all files on the system
+    :param scheduler: The Scheduler to run the deletions on, which defaults to the shared Scheduler
     """
 
-    def __init__(self, save: Save, callback: callable):
-        super().__init__(target=self.run)
+    TARGET_ATTEMPTS = 8
+
+    def __init__(self, save: Save, callback: callable, scheduler: Scheduler = None):
         self.__save = save
-        self.__is_alive = True
         self.__callback = callback
+        self.__scheduler = scheduler if scheduler is not None else Scheduler.get_instance()
+        self.__timer: Optional[int] = None
         self.start()
 
     def delete_file(self):
         """Deletes a random file from the filesystem and adds it to the deletion log
         which is used in the mntr command
+
+        A file can not be moved into the Trash while an Entry with the same name is already there,
+        so another random file is chosen instead. Once TARGET_ATTEMPTS files have collided,
+        the first file that does not collide is deleted, and nothing is deleted only if every file collides
         """
-        target_file = choose_random_file(self.__save.get_root())
-        file_log = str(target_file)
-        parent_dir = target_file.get_parent()
-        parent_dir.remove_entry(target_file)
-        target_file.set_parent(self.__save.get_trash())
-        self.__save.get_trash().add_entry(target_file)
-        virus_id = randint(self.__save.get_virus_files()[0] + 1, self.__save.get_virus_files()[1])
-        self.__save.log_deletion(virus_id, file_log)
+        with self.__save.transaction():
+            trash = self.__save.get_trash()
+            target_file = None
+            for _ in range(Virus.TARGET_ATTEMPTS):
+                target_file = choose_random_file(self.__save.get_root(), self.__save.get_random(),
+                                                 self.__save.get_sampling_policy())
+                if target_file is None or trash.get_entry(target_file.get_name()) is None:
+                    break
+            else:
+                target_file = self.__find_file(self.__save.get_root(), trash)
+            if target_file is None:
+                return
+            file_log = str(target_file)
+            if self.__save.delete_entries([target_file]):
+                return
+            virus_id = self.__save.get_random().randint(
+                self.__save.get_virus_files()[0] + 1, self.__save.get_virus_files()[1])
+            self.__save.log_deletion(virus_id, file_log)
+
+    @staticmethod
+    def __find_file(root: Directory, trash: Directory) -> Optional[NormalFile]:
+        """Returns the first file below the root Directory whose name is not already in the Trash,
+        or None if every file has the name of an Entry in the Trash
+
+        :param root: The Directory to search below
+        :param trash: The Trash that the file will be moved into
+        """
+        directories = [root]
+        while directories:
+            directory = directories.pop()
+            for file in directory.get_files():
+                if trash.get_entry(file.get_name()) is None:
+                    return file
+            directories.extend(subdirectory for subdirectory in directory.get_directories()
+                               if subdirectory.get_normal_file_count() > 0)
+        return None
+
+    def is_running(self) -> bool:
+        """Returns whether or not the Virus has a deletion scheduled"""
+        return self.__timer is not None
+
+    def start(self):
+        """Schedules the first deletion of the Virus if it is not already running"""
+        if self.__timer is None:
+            self.__timer = self.__scheduler.schedule(self.__save.get_speed(), self.run)
 
     def stop(self):
-        """Sets the Thread as being dead"""
-        self.__is_alive = False
+        """Cancels the next deletion of the Virus"""
+        if self.__timer is not None:
+            self.__scheduler.cancel(self.__timer)
+            self.__timer = None
 
     def run(self):
         """This function is what is executed when the Virus deletes a file
-        but only while there are still normal files on the system
+        and schedules the next deletion while there are still normal files on the system
         """
-        while self.__save.get_normal_files()[0] < self.__save.get_normal_files()[1]:
+        self.__timer = None
+        if self.__save.get_remaining_files() > 0:
             self.delete_file()
-            for _ in range(self.__save.get_speed()):
-                if self.__is_alive:
-                    sleep(1)
-                    continue
-                return
-        self.__callback()
+        if self.__save.get_remaining_files() > 0:
+            self.__timer = self.__scheduler.schedule(self.__save.get_speed(), self.run)
+        else:
+            self.__callback()
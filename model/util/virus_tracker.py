@@ -0,0 +1,104 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from model import Directory, VirusFile
+
+
+class VirusTracker:
+    """A VirusTracker keeps track of the virus files that the player has found,
+    by the number the player gave them, so they can be found again later
+
+    Each virus file is tracked by its identity rather than by its path so it is
+    followed wherever it is moved. A virus file is only ever tracked under one number.
+    """
+
+    def __init__(self):
+        self.__by_number: Dict[int, VirusFile] = {}
+        self.__by_entry: Dict[int, int] = {}
+
+        # The paths of tracked virus files that were loaded from a game save
+        #   but not found in the filesystem yet
+        self.__unresolved: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.__by_number) + len(self.__unresolved)
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        """Returns an iterator over the numbers and the current paths of the tracked virus files, in order"""
+        tracked = {number: str(file) for number, file in self.__by_number.items()}
+        tracked.update(self.__unresolved)
+        return iter(sorted(tracked.items()))
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def get(self, number: int) -> Optional[VirusFile]:
+        """Returns the virus file tracked under the number, if any
+
+        :param number: The number the virus file was tracked under
+        """
+        return self.__by_number.get(number)
+
+    def get_number(self, file: VirusFile) -> Optional[int]:
+        """Returns the number that the virus file is tracked under, if it is tracked
+
+        :param file: The virus file
+        """
+        return self.__by_entry.get(id(file))
+
+    def track(self, number: int, file: VirusFile):
+        """Tracks the virus file under the number, replacing whatever was tracked under it before
+
+        :param number: The number to track the virus file under
+        :param file: The virus file to track
+        """
+        self.untrack(file)
+        previous = self.__by_number.pop(number, None)
+        if previous is not None:
+            del self.__by_entry[id(previous)]
+        self.__unresolved.pop(number, None)
+        self.__by_number[number] = file
+        self.__by_entry[id(file)] = number
+
+    def untrack(self, file: VirusFile):
+        """Stops tracking the virus file, if it is tracked
+
+        :param file: The virus file
+        """
+        number = self.__by_entry.pop(id(file), None)
+        if number is not None:
+            del self.__by_number[number]
+
+    # # # # # # # # # # # # # # # # # # # #
+
+    def resolve(self, root: Directory):
+        """Finds the tracked virus files that were loaded from a game save in the filesystem
+
+        :param root: The root Directory of the filesystem
+        """
+        unresolved, self.__unresolved = self.__unresolved, {}
+        for number, path in unresolved.items():
+            file = root.resolve(path)
+            if isinstance(file, VirusFile):
+                self.track(number, file)
+
+    def to_json(self) -> List[Optional[str]]:
+        """Returns the paths of the tracked virus files, at the index of the number they are tracked under
+        minus one, with None for every number that nothing is tracked under
+        """
+        tracked = list(self)
+        paths = [None] * (tracked[-1][0] if tracked else 0)
+        for number, path in tracked:
+            paths[number - 1] = path
+        return paths
+
+    @staticmethod
+    def from_json(json: List[Optional[str]]) -> 'VirusTracker':
+        """Creates a VirusTracker from the paths of the tracked virus files which are found
+        in the filesystem once it is given to resolve
+
+        :param json: The JSON list of the paths of the tracked virus files
+        """
+        tracker = VirusTracker()
+        for index, path in enumerate(json):
+            if path is not None:
+                tracker.__unresolved[index + 1] = path
+        return tracker
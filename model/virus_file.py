@@ -13,17 +13,18 @@ class VirusFile(NormalFile):
     :param number: The number to give to the VirusFile
     :param name: The name to give to the VirusFile
     :param parent: The parent directory of this VirusFile
+    :param size: The amount of bytes in the VirusFile
+    :param seed: The seed that the bytes of the VirusFile are generated from
     """
 
     IDENTIFYING_BYTES = [124, 56, 198, 248, 119, 64, 87, 12]
                 # in hex: 7c, 38,  c6,  f8,  77, 40, 57, 0c
 
-    def __init__(self, number: int, name: str, parent: 'Directory' = None):
-        super().__init__(name, parent)
+    __slots__ = ("__number",)
+
+    def __init__(self, number: int, name: str, parent: 'Directory' = None, size: int = None, seed: int = None):
+        super().__init__(name, parent, size, seed)
         self.__number = number
-        for byte in range(len(VirusFile.IDENTIFYING_BYTES)):
-            self._file_bytes[byte] = VirusFile.IDENTIFYING_BYTES[byte]
-        self._file_bytes[-1] = number
 
     # # # # # # # # # # # # # # # # # # # #
 
@@ -31,6 +32,15 @@ class VirusFile(NormalFile):
         """Returns the number of this VirusFile"""
         return self.__number
 
+    def get_bytes(self) -> bytes:
+        """Returns the bytes of this file which start with the identifying bytes
+        and end with the number of this VirusFile
+        """
+        file_bytes = bytearray(super().get_bytes())
+        file_bytes[:len(VirusFile.IDENTIFYING_BYTES)] = bytes(VirusFile.IDENTIFYING_BYTES)
+        file_bytes[-1] = self.__number & 0xFF
+        return bytes(file_bytes)
+
     # # # # # # # # # # # # # # # # # # # #
 
     def to_json(self) -> dict:
@@ -38,12 +48,16 @@ class VirusFile(NormalFile):
             "type": "VirusFile",
             "number": self.get_number(),
             "name": self.get_name(),
-            "size": self.get_size()}
+            "size": self.get_size(),
+            "seed": self.get_seed()}
 
     @staticmethod
     def from_json(json: dict):
         """Converts a JSON object into a VirusFile object
 
+        Files saved before seeds were stored have their seed derived from their number and name
+        since, unlike a NormalFile, a VirusFile does not remember the Directory it started out in
+
         :param json: The JSON object to convert
         :raises TypeError: When json.type is not 'VirusFile'
         :raises KeyError: When the VirusFile's number or name is not specified in the JSON object
@@ -55,4 +69,7 @@ class VirusFile(NormalFile):
         if "name" not in json:
             raise KeyError("\"name\" key must exist to create VirusFile object")
 
-        return VirusFile(json["number"], json["name"])
+        seed = json.get("seed")
+        if seed is None:
+            seed = NormalFile.derive_seed(0, f"{json['number']}/{json['name']}")
+        return VirusFile(json["number"], json["name"], size=json.get("size"), seed=seed)
@@ -17,8 +17,7 @@ def load_game(console, command):
         console["on_load_game"] = False
         for gamesave, _ in console.get_saves():
             if gamesave.get_username() == command:
-                gamesave.generate()
-                console.set_save(gamesave.get_username())
+                console.set_save(gamesave)
                 console.in_play()
                 return f"Loaded gamesave {gamesave.get_username()} ..."
         return f"No gamesave found for {command}"